@@ -0,0 +1,149 @@
+from datetime import datetime
+
+from flask import Blueprint, abort, current_app, jsonify, request
+from sqlalchemy.orm import joinedload, load_only, selectinload
+from werkzeug.exceptions import HTTPException
+
+from models import Artist, Show, Venue
+from pages import (
+    ARTIST_FIELDS,
+    SHOW_FIELDS,
+    VENUE_FIELDS,
+    artist_show_dict,
+    entity_dict,
+    paginate,
+    venue_show_dict,
+)
+
+bp = Blueprint("api", __name__, url_prefix="/api/v1")
+
+API_MODELS = {
+    "venues": (Venue, VENUE_FIELDS),
+    "artists": (Artist, ARTIST_FIELDS),
+    "shows": (Show, SHOW_FIELDS),
+}
+# fields of an artist or venue embedded in a show
+SUMMARY_FIELDS = ("id", "name", "image_link")
+
+
+def by_start_time(shows):
+    return sorted(shows, key=lambda show: show.start_time)
+
+
+# per model, what ?embed= accepts: the loader option fetching the relation
+# with the page (one more query at most) and the function serializing it
+API_EMBEDS = {
+    Venue: {
+        "shows": (
+            selectinload(Venue.children).joinedload(Show.artist),
+            lambda venue: [
+                venue_show_dict(show) for show in by_start_time(venue.children)
+            ],
+        ),
+    },
+    Artist: {
+        "shows": (
+            selectinload(Artist.parents).joinedload(Show.venue),
+            lambda artist: [
+                artist_show_dict(show)
+                for show in by_start_time(artist.parents)
+            ],
+        ),
+    },
+    Show: {
+        "venue": (
+            joinedload(Show.venue),
+            lambda show: entity_dict(show.venue, SUMMARY_FIELDS),
+        ),
+        "artist": (
+            joinedload(Show.artist),
+            lambda show: entity_dict(show.artist, SUMMARY_FIELDS),
+        ),
+    },
+}
+
+
+def list_arg(name, allowed=None, convert=str):
+    # "?fields=id,name" -> ["id", "name"]; 400 on anything not allowed
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        values = [convert(item) for item in value.split(",")]
+    except ValueError:
+        abort(400)
+    if allowed is not None and not set(values) <= set(allowed):
+        abort(400)
+    return values
+
+
+def to_json(value):
+    # ISO 8601 rather than the HTTP dates jsonify would write
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {key: to_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_json(item) for item in value]
+    return value
+
+
+def api_query(model, fields, embeds):
+    # only the requested columns, genres and embedded relations
+    columns = [getattr(model, field) for field in fields if field != "genres"]
+    options = [load_only(model.id, *columns)]
+    if "genres" in fields:
+        options.append(selectinload(model.genres))
+    for embed in embeds:
+        options.append(API_EMBEDS[model][embed][0])
+    return model.query.options(*options)
+
+
+def api_dict(row, model, fields, embeds):
+    data = entity_dict(row, fields)
+    for embed in embeds:
+        data[embed] = API_EMBEDS[model][embed][1](row)
+    return data
+
+
+@bp.route("/<any(venues, artists, shows):resource>")
+def api_list(resource):
+    """List venues, artists or shows in id order.
+
+    ?fields=id,name picks the fields, ?embed=shows (venue, artist for
+    shows) adds related rows, ?ids=1,2,3 fetches those rows at once and
+    otherwise ?after/?before/?limit page through all of them.
+    """
+    model, allowed = API_MODELS[resource]
+    fields = list_arg("fields", allowed) or allowed
+    embeds = list_arg("embed", API_EMBEDS[model]) or []
+    query = api_query(model, fields, embeds)
+    ids = list_arg("ids", convert=int)
+    if ids is not None:
+        if len(ids) > current_app.config["MAX_PAGE_SIZE"]:
+            abort(400)
+        rows = query.filter(model.id.in_(ids)).order_by(model.id).all()
+        page = None
+    else:
+        rows, page = paginate(query, (model.id,), (int,))
+    data = [api_dict(row, model, fields, embeds) for row in rows]
+    return jsonify(to_json({"data": data, "page": page}))
+
+
+@bp.route("/<any(venues, artists, shows):resource>/<int:id>")
+def api_detail(resource, id):
+    model, allowed = API_MODELS[resource]
+    fields = list_arg("fields", allowed) or allowed
+    embeds = list_arg("embed", API_EMBEDS[model]) or []
+    row = api_query(model, fields, embeds).filter(model.id == id).first()
+    if row is None:
+        abort(404)
+    return jsonify(to_json({"data": api_dict(row, model, fields, embeds)}))
+
+
+# the app's own 404 and 500 handlers render HTML pages
+@bp.errorhandler(HTTPException)
+@bp.errorhandler(404)
+@bp.errorhandler(500)
+def api_error(error):
+    return jsonify({"error": error.name}), error.code
@@ -0,0 +1,338 @@
+import sys
+from datetime import datetime
+
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+from sqlalchemy import and_, func
+from sqlalchemy.orm import joinedload, selectinload
+
+from models import (
+    Artist,
+    ArtistShowCount,
+    Genre,
+    Show,
+    Venue,
+    db,
+    delete_with_shows,
+    entity_deleted,
+)
+from pages import (
+    ARTIST_FIELDS,
+    abort_if_not_modified,
+    artist_show_dict,
+    artist_venue_ids,
+    bucket_start,
+    cache,
+    cache_listing,
+    entity_dict,
+    invalidate_pages,
+    listing_cache_key,
+    listing_validators,
+    now_bucket,
+    stream_listing,
+    stream_page,
+)
+from search import full_text_search
+
+bp = Blueprint("artists", __name__)
+
+
+@bp.route("/artists")
+def artists():
+    from forms import SearchForm
+
+    # [done] TODO: replace with real data returned from querying the database
+    now = datetime.today()
+    abort_if_not_modified(*listing_validators(now))
+    form = SearchForm()
+    cache_key = listing_cache_key(now)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        data, page = cached
+        return stream_listing(
+            "pages/artists.html", artists=data, form=form, page=page
+        )
+    # rendered as the rows come in, see stream_page
+    artists, page = stream_page(
+        Artist.query.outerjoin(
+            ArtistShowCount, ArtistShowCount.artist_id == Artist.id
+        ).with_entities(
+            Artist.id,
+            Artist.name,
+            func.coalesce(ArtistShowCount.upcoming_shows, 0).label(
+                "num_upcoming_shows"
+            ),
+        ),
+        (Artist.name, Artist.id),
+        (str, int),
+    )
+    data = (
+        {
+            "id": artist.id,
+            "name": artist.name,
+            "num_upcoming_shows": artist.num_upcoming_shows,
+        }
+        for artist in artists
+    )
+    return stream_listing(
+        "pages/artists.html",
+        artists=cache_listing(data, cache_key, page),
+        form=form,
+        page=page,
+    )
+
+
+@bp.route("/artists/search", methods=["POST"])
+def search_artists():
+    # [done]TODO: implement search on artists with partial string search. Ensure it is case-insensitive.
+    # seach for "A" should return "Guns N Petals", "Matt Quevado", and "The Wild Sax Band".
+    # search for "band" should return "The Wild Sax Band".
+    search_form = request.form
+    if "search_term" in search_form:
+        search_term = search_form.get("search_term", "")
+        if search_term:
+            res = full_text_search(
+                Artist, search_term, current_app.config["SEARCH_RESULT_LIMIT"]
+            )
+            response = {}
+            response["count"] = len(res)
+            response["data"] = []
+            for r in res:
+                r_data = {
+                    "id": r.id,
+                    "name": r.name,
+                }
+                response["data"].append(r_data)
+
+            return render_template(
+                "pages/search_artists.html",
+                results=response,
+                search_term=search_form["search_term"],
+            )
+    if "city" in search_form:
+        city = search_form["city"]
+        state = search_form["state"]
+        res = (
+            Artist.query.filter(
+                and_(Artist.city == city, Artist.state == state)
+            )
+            .order_by(Artist.id)
+            .all()
+        )
+        response = {}
+        response["count"] = len(res)
+        response["data"] = []
+        for r in res:
+            r_data = {
+                "id": r.id,
+                "name": r.name,
+            }
+            response["data"].append(r_data)
+
+        return render_template(
+            "pages/search_artists.html",
+            results=response,
+            search_term="{} {}".format(city, state),
+        )
+
+    return redirect(url_for(".artists"))
+
+
+@bp.route("/artists/genres/<genre>")
+def artists_by_genre(genre):
+    # served by the genre name and artist_genre.genre_id indexes
+    res = (
+        Artist.query.join(Artist.genres)
+        .filter(Genre.name == genre)
+        .order_by(Artist.id)
+        .limit(current_app.config["SEARCH_RESULT_LIMIT"])
+        .all()
+    )
+    response = {
+        "count": len(res),
+        "data": [{"id": r.id, "name": r.name} for r in res],
+    }
+    return render_template(
+        "pages/search_artists.html", results=response, search_term=genre
+    )
+
+
+@bp.route("/artists/<int:artist_id>")
+def show_artist(artist_id):
+    # shows the venue page with the given venue_id
+    # [Done] TODO: replace with real venue data from the venues table, using venue_id
+    now = datetime.today()
+    validators = (
+        db.session.query(
+            Artist.updated_at,
+            func.max(Show.updated_at),
+            func.max(Venue.updated_at),
+            func.count(Show.id),
+        )
+        .select_from(Artist)
+        .outerjoin(Artist.parents)
+        .outerjoin(Show.venue)
+        .filter(Artist.id == artist_id)
+        .group_by(Artist.id)
+        .first()
+    )
+    if validators is None:
+        abort(404)
+    abort_if_not_modified(bucket_start(now), *validators)
+    cache_key = cache.key("artist:{}".format(artist_id), now_bucket(now))
+    artist_data = cache.get(cache_key)
+    if artist_data is not None:
+        return render_template("pages/show_artist.html", artist=artist_data)
+    artist = Artist.query.options(
+        joinedload(Artist.parents).joinedload(Show.venue),
+        selectinload(Artist.genres),
+    ).get(artist_id)
+    if artist is None:
+        abort(404)
+    artist_data = entity_dict(artist, ARTIST_FIELDS)
+    past_shows = []
+    upcoming_shows = []
+    for data in sorted(artist.parents, key=lambda show: show.start_time):
+        show = artist_show_dict(data)
+        # the key of its card's {% cache %} fragment
+        show["id"] = data.id
+        show["updated_at"] = max(data.updated_at, data.venue.updated_at)
+        if data.start_time <= now:
+            past_shows.append(show)
+        else:
+            upcoming_shows.append(show)
+    artist_data["past_shows"] = past_shows
+    artist_data["past_shows_count"] = len(past_shows)
+    artist_data["upcoming_shows"] = upcoming_shows
+    artist_data["upcoming_shows_count"] = len(upcoming_shows)
+    cache.set(cache_key, artist_data)
+
+    return render_template("pages/show_artist.html", artist=artist_data)
+
+
+#  Update Artist
+#  ----------------------------------------------------------------
+
+
+@bp.route("/artists/<int:artist_id>/edit", methods=["GET"])
+def edit_artist(artist_id):
+    from forms import ArtistForm
+
+    artist = Artist.query.get(artist_id)
+    artist_data = entity_dict(artist, ARTIST_FIELDS)
+    form = ArtistForm(data=artist_data)
+    # TODO:[done] populate form with fields from artist with ID <artist_id>
+    return render_template("forms/edit_artist.html", form=form, artist=artist)
+
+
+@bp.route("/artists/<int:artist_id>/edit", methods=["POST"])
+def edit_artist_submission(artist_id):
+    # [done] TODO: take values from the form submitted, and update existing
+    # artist record with ID <artist_id> using the new attributes
+    artist = Artist.query.get(artist_id)
+    artist_info = request.form
+    artist_info = artist_info.to_dict(flat=False)
+    artist.name = artist_info["name"][0]
+    artist.image_link = artist_info["image_link"][0]
+    artist.city = artist_info["city"][0]
+    artist.state = artist_info["state"][0]
+    artist.website = artist_info["website"][0]
+    artist.phone = artist_info["phone"][0]
+    artist.genres = Genre.from_names(artist_info["genres"])
+    artist.facebook_link = artist_info["facebook_link"][0]
+    artist.seeking_venue = True if "seeking_venue" in artist_info else False
+    artist.seeking_description = artist_info["seeking_description"][0]
+    db.session.commit()
+    invalidate_pages(
+        venue_ids=artist_venue_ids(artist_id), artist_ids=[artist_id]
+    )
+    return redirect(url_for(".show_artist", artist_id=artist_id))
+
+
+#  Create Artist
+#  ----------------------------------------------------------------
+
+
+@bp.route("/artists/create", methods=["GET"])
+def create_artist_form():
+    from forms import ArtistForm
+
+    form = ArtistForm()
+    return render_template("forms/new_artist.html", form=form)
+
+
+@bp.route("/artists/create", methods=["POST"])
+def create_artist_submission():
+    # called upon submitting the new artist listing form
+    # TODO: insert form data as a new Artist record in the db, instead [Done]
+    # TODO: modify data to be the data object returned from db insertion
+    artist_info = request.form
+    artist_info = artist_info.to_dict(flat=False)
+    try:
+        artist = Artist(
+            name=artist_info["name"][0],
+            image_link=artist_info["image_link"][0],
+            city=artist_info["city"][0],
+            state=artist_info["state"][0],
+            website=artist_info["website"][0],
+            phone=artist_info["phone"][0],
+            genres=Genre.from_names(artist_info["genres"]),
+            facebook_link=artist_info["facebook_link"][0],
+            seeking_venue=True if "seeking_venue" in artist_info else False,
+            seeking_description=artist_info["seeking_description"][0],
+        )
+        db.session.add(artist)
+        db.session.commit()
+        cache.invalidate("listings")
+        # on successful db insert, flash success
+        flash("Artist " + artist_info["name"][0] + " was successfully listed!")
+    except:
+        db.session.rollback()
+        print(sys.exc_info())
+        flash(
+            "An error occurred. Artist "
+            + artist_info["name"][0]
+            + " could not be listed."
+        )
+    finally:
+        db.session.close()
+    # [done] TODO: on unsuccessful db insert, flash an error instead.
+    # e.g., flash('An error occurred. Artist ' + data.name + ' could not be listed.')
+    return render_template("pages/home.html")
+
+
+@bp.route("/artists/<int:artist_id>", methods=["DELETE"])
+def delete_artist(artist_id):
+    error = False
+    try:
+        deleted = delete_with_shows(
+            Artist, artist_id, current_app.config["DELETE_BATCH_SIZE"]
+        )
+    except:
+        error = True
+        db.session.rollback()
+        print(sys.exc_info())
+    finally:
+        db.session.close()
+    if error:
+        abort(500)
+    elif deleted is None:
+        abort(404)
+    name, ids = deleted
+    try:
+        # its pages are invalidated by pages.invalidate_deleted
+        entity_deleted.send(Artist, **ids)
+    except Exception:
+        # the delete is committed all the same; stale pages age out
+        current_app.logger.exception("invalidating %s failed", name)
+    flash(name + " is deleted successfully.")
+    return jsonify({"success": True})
@@ -0,0 +1,299 @@
+"""Fingerprinted, precompressed static files.
+
+flask build-assets copies every file of static/ to ASSET_BUILD_DIR under a
+name holding a hash of its content (css/main.3c9a0e1b2f.css), with gzip
+and, when the brotli package is installed, brotli compressed copies of the
+text files next to it. The images of ASSET_RESPONSIVE_IMAGES are also
+re-encoded by Pillow into ASSET_IMAGE_WIDTHS wide AVIF, WebP and JPEG
+copies. manifest.json maps the static/ names to the built ones.
+
+Templates link to static_url("css/main.css"): the built file under
+/assets/, which browsers may cache for good since its name changes with
+its content, or the plain /static/ one while there is no current build.
+Old builds are never deleted, pages cached before a deploy still link
+to them.
+"""
+import gzip
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import posixpath
+import re
+
+from flask import Blueprint, current_app, request, send_from_directory, url_for
+
+bp = Blueprint("assets", __name__)
+
+MANIFEST = "manifest.json"
+# hex digits of the content hash kept in the name
+HASH_LENGTH = 10
+COMPRESSIBLE_TYPES = (
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+    "font/otf",
+    "font/ttf",
+    "application/vnd.ms-fontobject",
+)
+# a compressed copy saving less than this is not worth a second file
+MIN_SAVING = 0.05
+# Accept-Encoding name and suffix of the compressed copies, best first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+IMAGE_TYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+}
+IMAGE_QUALITY = {"avif": 50, "webp": 75, "jpeg": 80}
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def content_type(name):
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+
+def is_compressible(name):
+    type = content_type(name)
+    return type.startswith("text/") or type in COMPRESSIBLE_TYPES
+
+
+def fingerprinted(name, data):
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    root, extension = posixpath.splitext(name)
+    return "{}.{}{}".format(root, digest, extension)
+
+
+def source_names(static_folder, build_dir):
+    names = []
+    for folder, subfolders, files in os.walk(static_folder):
+        # a build inside static/ is not a source
+        subfolders[:] = [
+            subfolder
+            for subfolder in subfolders
+            if os.path.join(folder, subfolder) != build_dir
+        ]
+        for file in files:
+            if not file.startswith("."):
+                path = os.path.relpath(
+                    os.path.join(folder, file), static_folder
+                )
+                names.append(path.replace(os.sep, "/"))
+    # css last: its url()s point to the built names of the others
+    return sorted(names, key=lambda name: (name.endswith(".css"), name))
+
+
+def rewrite_css_urls(name, css, files):
+    folder = posixpath.dirname(name)
+
+    def built_url(match):
+        quote, url = match.groups()
+        if url.startswith(("data:", "/", "#")) or "://" in url:
+            return match.group(0)
+        path, suffix = re.match(r"([^?#]*)(.*)", url).groups()
+        target = posixpath.normpath(posixpath.join(folder, path))
+        if target not in files:
+            return match.group(0)
+        url = posixpath.relpath(files[target], folder) + suffix
+        return "url({0}{1}{0})".format(quote, url)
+
+    return CSS_URL.sub(built_url, css.decode("utf-8")).encode("utf-8")
+
+
+def gzip_compress(data):
+    # mtime=0: the same file always compresses to the same bytes
+    return gzip.compress(data, 9, mtime=0)
+
+
+def compressors():
+    """(encoding, suffix, compress) of the compressed copies to write."""
+    try:
+        # optional dependency, only needed at build time
+        import brotli
+    except ImportError:
+        current_app.logger.warning("brotli is not installed, no .br files")
+        return [("gzip", ".gz", gzip_compress)]
+    return [("br", ".br", brotli.compress), ("gzip", ".gz", gzip_compress)]
+
+
+def write_file(build_dir, name, data, compress=()):
+    """Write data as name in build_dir; returns the encodings written."""
+    path = os.path.join(build_dir, *name.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(data)
+    if not is_compressible(name):
+        return []
+    encodings = []
+    for encoding, suffix, encode in compress:
+        body = encode(data)
+        if len(body) <= len(data) * (1 - MIN_SAVING):
+            with open(path + suffix, "wb") as file:
+                file.write(body)
+            encodings.append(encoding)
+    return encodings
+
+
+def image_variants(data, widths, formats):
+    """(format, width, encoded image) of an image, at most as wide as it."""
+    try:
+        # optional dependency, only needed at build time
+        from PIL import Image
+    except ImportError:
+        current_app.logger.warning("Pillow is not installed, no images")
+        return []
+
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    Image.init()
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+    sizes = sorted({min(width, image.width) for width in widths})
+    variants = []
+    for format in formats:
+        if format.upper() not in Image.SAVE:
+            # AVIF needs Pillow 11.2 or pillow-avif-plugin
+            current_app.logger.warning("Pillow can't write %s", format)
+            continue
+        for width in sizes:
+            height = round(image.height * width / image.width)
+            resized = image.resize((width, height), Image.LANCZOS)
+            if format == "jpeg":
+                resized = resized.convert("RGB")
+            output = io.BytesIO()
+            resized.save(
+                output,
+                format.upper(),
+                quality=IMAGE_QUALITY.get(format, 80),
+                optimize=format == "jpeg",
+            )
+            variants.append((format, width, output.getvalue()))
+    return variants
+
+
+def build(app, build_dir):
+    """Build the app's static files into build_dir; returns the manifest."""
+    config = app.config
+    static_folder = app.static_folder
+    compress = compressors()
+    files = {}
+    encodings = {}
+    images = {}
+    for name in source_names(static_folder, os.path.abspath(build_dir)):
+        with open(os.path.join(static_folder, *name.split("/")), "rb") as file:
+            data = file.read()
+        if name.endswith(".css"):
+            data = rewrite_css_urls(name, data, files)
+        files[name] = fingerprinted(name, data)
+        encodings[files[name]] = write_file(
+            build_dir, files[name], data, compress
+        )
+        if name in config["ASSET_RESPONSIVE_IMAGES"]:
+            root = posixpath.splitext(name)[0]
+            sources = images[name] = {}
+            for format, width, image in image_variants(
+                data,
+                config["ASSET_IMAGE_WIDTHS"],
+                config["ASSET_IMAGE_FORMATS"],
+            ):
+                variant = "{}.{}w.{}".format(root, width, format)
+                built = fingerprinted(variant, image)
+                write_file(build_dir, built, image)
+                sources.setdefault(format, []).append([width, built])
+    manifest = {"files": files, "encodings": encodings, "images": images}
+    path = os.path.join(build_dir, MANIFEST)
+    # the running workers may read it meanwhile
+    with open(path + ".tmp", "w") as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+    return manifest
+
+
+def manifest_is_current(app, path):
+    # a file changed since the build would be served in its old version
+    if not os.path.isfile(path):
+        return False
+    built = os.path.getmtime(path)
+    build_dir = os.path.abspath(os.path.dirname(path))
+    return all(
+        os.path.getmtime(os.path.join(app.static_folder, name)) <= built
+        for name in source_names(app.static_folder, build_dir)
+    )
+
+
+def init_app(app):
+    """Load the manifest of ASSET_BUILD_DIR, outside debug mode."""
+    manifest = None
+    build_dir = app.config["ASSET_BUILD_DIR"]
+    path = build_dir and os.path.join(build_dir, MANIFEST)
+    if path and not app.debug:
+        if manifest_is_current(app, path):
+            with open(path) as file:
+                manifest = json.load(file)
+        elif os.path.isfile(path):
+            app.logger.warning(
+                "%s is older than the static files and is ignored, "
+                "run flask build-assets",
+                path,
+            )
+    app.extensions["assets"] = manifest
+    app.jinja_env.globals.update(
+        static_url=static_url, image_sources=image_sources
+    )
+    app.register_blueprint(bp)
+
+
+def static_url(filename):
+    manifest = current_app.extensions["assets"]
+    if manifest is None or filename not in manifest["files"]:
+        return url_for("static", filename=filename)
+    return url_for("assets.asset", filename=manifest["files"][filename])
+
+
+def image_sources(filename):
+    """(content type, srcset) of the re-encoded copies of an image.
+
+    Best format first, for the <source> elements of a <picture>; none
+    without a build.
+    """
+    manifest = current_app.extensions["assets"]
+    if manifest is None:
+        return []
+    sources = manifest["images"].get(filename, {})
+    return [
+        (
+            IMAGE_TYPES[format],
+            ", ".join(
+                "{} {}w".format(url_for("assets.asset", filename=name), width)
+                for width, name in sources[format]
+            ),
+        )
+        for format in current_app.config["ASSET_IMAGE_FORMATS"]
+        if format in sources
+    ]
+
+
+@bp.route("/assets/<path:filename>")
+def asset(filename):
+    # the name holds the content hash, so the content never changes
+    manifest = current_app.extensions["assets"] or {"encodings": {}}
+    available = manifest["encodings"].get(filename, [])
+    suffix = ""
+    for encoding, encoding_suffix in ENCODINGS:
+        if encoding in available and request.accept_encodings[encoding]:
+            suffix = encoding_suffix
+            break
+    response = send_from_directory(
+        current_app.config["ASSET_BUILD_DIR"],
+        filename + suffix,
+        mimetype=content_type(filename),
+        max_age=current_app.config["ASSET_MAX_AGE"],
+    )
+    if suffix:
+        response.content_encoding = encoding
+    if available:
+        response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
@@ -0,0 +1,241 @@
+"""Async versions of the views that wait the most on the database.
+
+With ASYNC_VIEWS on, create_app serves the venue page, /shows and the
+searches with these coroutines instead. They build the same statements as
+the sync views but run them on SQLAlchemy's asyncio engine (asyncpg, or
+aiosqlite for SQLite), and the queries a page needs that don't depend on
+each other run at the same time. Needs the optional packages in
+requirements-async.txt.
+"""
+
+from datetime import datetime
+
+from flask import (
+    abort,
+    current_app,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+from sqlalchemy import and_, select
+from sqlalchemy.orm import selectinload
+
+from asyncdb import AsyncDatabase
+from models import Artist, Show, Venue
+from pages import (
+    VENUE_FIELDS,
+    abort_if_not_modified,
+    bucket_start,
+    cache,
+    entity_dict,
+    listing_cache_key,
+    listing_validators,
+    now_bucket,
+    page_query,
+    page_rows,
+)
+from search import search_queries
+from venues import venue_validators
+
+adb = AsyncDatabase()
+
+
+def show_dict(row, *stamps):
+    # a show row as the sync views list it: updated_at, the key of its
+    # card's {% cache %} fragment, is the latest of its and of stamps
+    show = dict(row._mapping)
+    show["updated_at"] = max(
+        show.pop(stamp) for stamp in ("updated_at",) + stamps
+    )
+    return show
+
+
+async def search_rows(models, search_term, limit):
+    # the (id, name) rows matching search_term of each model, searched
+    # concurrently; the typo-forgiving fallbacks only run where needed
+    searches = [
+        search_queries(
+            select(model.id, model.name),
+            model,
+            search_term,
+            limit,
+            adb.dialect,
+        )
+        for model in models
+    ]
+    results = await adb.gather(*[matches for matches, _ in searches])
+    rows = []
+    for (matches, fallback), result in zip(searches, results):
+        matched = result.all()
+        if not matched and fallback is not None:
+            matched = (await adb.execute(fallback)).all()
+        rows.append(matched)
+    return rows
+
+
+async def search_page(model, template, listing_endpoint):
+    # /venues/search and /artists/search, see search_venues
+    search_form = request.form
+    search_term = search_form.get("search_term", "")
+    if search_term:
+        (res,) = await search_rows(
+            [model], search_term, current_app.config["SEARCH_RESULT_LIMIT"]
+        )
+    elif "city" in search_form:
+        city = search_form["city"]
+        state = search_form["state"]
+        search_term = "{} {}".format(city, state)
+        result = await adb.execute(
+            select(model.id, model.name)
+            .filter(and_(model.city == city, model.state == state))
+            .order_by(model.id)
+        )
+        res = result.all()
+    else:
+        return redirect(url_for(listing_endpoint))
+    response = {
+        "count": len(res),
+        "data": [{"id": r.id, "name": r.name} for r in res],
+    }
+    return render_template(template, results=response, search_term=search_term)
+
+
+async def search_venues():
+    return await search_page(
+        Venue, "pages/search_venues.html", "venues.venues"
+    )
+
+
+async def search_artists():
+    return await search_page(
+        Artist, "pages/search_artists.html", "artists.artists"
+    )
+
+
+async def search():
+    # see main.search
+    search_term = request.args.get("q", "").strip()
+    if not search_term:
+        abort(400)
+    limit = request.args.get(
+        "limit", current_app.config["SEARCH_RESULT_LIMIT"], type=int
+    )
+    limit = max(1, min(limit, current_app.config["SEARCH_RESULT_LIMIT"]))
+    models = {"venues": Venue, "artists": Artist}
+    search_type = request.args.get("type")
+    if search_type is not None:
+        if search_type not in models:
+            abort(400)
+        models = {search_type: models[search_type]}
+    response = {"search_term": search_term}
+    rows = await search_rows(models.values(), search_term, limit)
+    for key, res in zip(models, rows):
+        response[key] = {
+            "count": len(res),
+            "data": [{"id": r.id, "name": r.name} for r in res],
+        }
+    return jsonify(response)
+
+
+async def show_venue(venue_id):
+    # see venues.show_venue
+    now = datetime.today()
+    validators = (await adb.execute(venue_validators(venue_id))).first()
+    if validators is None:
+        abort(404)
+    abort_if_not_modified(bucket_start(now), *validators)
+    cache_key = cache.key("venue:{}".format(venue_id), now_bucket(now))
+    venue_data = cache.get(cache_key)
+    if venue_data is not None:
+        return render_template("pages/show_venue.html", venue=venue_data)
+    shows = (
+        select(
+            Show.id,
+            Show.updated_at,
+            Show.start_time,
+            Artist.updated_at.label("artist_updated_at"),
+            Artist.id.label("artist_id"),
+            Artist.name.label("artist_name"),
+            Artist.image_link.label("artist_image_link"),
+        )
+        .join(Show.artist)
+        .filter(Show.venue_id == venue_id)
+        .order_by(Show.start_time)
+    )
+    # the venue, its past and its upcoming shows at once
+    venue, past_shows, upcoming_shows = await adb.gather(
+        select(Venue)
+        .options(selectinload(Venue.genres))
+        .filter(Venue.id == venue_id),
+        shows.filter(Show.start_time <= now),
+        shows.filter(Show.start_time > now),
+    )
+    venue = venue.scalars().first()
+    if venue is None:
+        abort(404)
+    venue_data = entity_dict(venue, VENUE_FIELDS)
+    past_shows = [show_dict(show, "artist_updated_at") for show in past_shows]
+    upcoming_shows = [
+        show_dict(show, "artist_updated_at") for show in upcoming_shows
+    ]
+    venue_data["past_shows"] = past_shows
+    venue_data["past_shows_count"] = len(past_shows)
+    venue_data["upcoming_shows"] = upcoming_shows
+    venue_data["upcoming_shows_count"] = len(upcoming_shows)
+    cache.set(cache_key, venue_data)
+    return render_template("pages/show_venue.html", venue=venue_data)
+
+
+async def shows():
+    # see shows.shows
+    now = datetime.today()
+    abort_if_not_modified(*listing_validators(now))
+    cache_key = listing_cache_key(now)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        data, page = cached
+        return render_template("pages/shows.html", shows=data, page=page)
+    columns = (Show.start_time, Show.id)
+    query, window = page_query(
+        select(
+            Show.id,
+            Show.updated_at,
+            Show.start_time,
+            Venue.updated_at.label("venue_updated_at"),
+            Artist.updated_at.label("artist_updated_at"),
+            Venue.id.label("venue_id"),
+            Venue.name.label("venue_name"),
+            Artist.id.label("artist_id"),
+            Artist.name.label("artist_name"),
+            Artist.image_link.label("artist_image_link"),
+        )
+        .join(Show.venue)
+        .join(Show.artist)
+        .filter(Show.start_time > now),
+        columns,
+        (datetime.fromisoformat, int),
+    )
+    shows, page = page_rows((await adb.execute(query)).all(), columns, window)
+    data = [
+        show_dict(show, "venue_updated_at", "artist_updated_at")
+        for show in shows
+    ]
+    cache.set(cache_key, (data, page))
+    return render_template("pages/shows.html", shows=data, page=page)
+
+
+# endpoint -> the coroutine replacing its view
+ASYNC_VIEWS = {
+    "main.search": search,
+    "venues.search_venues": search_venues,
+    "venues.show_venue": show_venue,
+    "artists.search_artists": search_artists,
+    "shows.shows": shows,
+}
+
+
+def init_app(app):
+    adb.init_app(app)
+    app.view_functions.update(ASYNC_VIEWS)
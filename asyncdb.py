@@ -0,0 +1,166 @@
+import asyncio
+import functools
+import threading
+
+from flask import current_app
+from sqlalchemy.engine import make_url
+
+from database import engine_options, use_replica
+
+# SQLAlchemy asyncio drivers of the databases the app runs on
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_url(url):
+    """The URL of the same database through its asyncio driver.
+
+    postgresql://localhost/fyyur -> postgresql+asyncpg://localhost/fyyur
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError("No asyncio driver for {!r}".format(backend))
+    driver = "{}+{}".format(backend, ASYNC_DRIVERS[backend])
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+class AsyncDatabase(object):
+    """SQLAlchemy's asyncio engine for the async views.
+
+    Async views run on an event loop of their worker thread (see
+    async_to_sync), and asyncpg connections can't move between loops, so
+    the engines and their connection pools live on one event loop per
+    process, in a background thread. execute and gather can be awaited
+    from any loop: the view's loop just waits while the statements run
+    there, each on a connection of its own, so the statements given to
+    gather run concurrently.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._engines = {}
+        self._local = threading.local()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        config.setdefault("ASYNC_DATABASE_URL", None)
+        config.setdefault("ASYNC_ENGINE_OPTIONS", None)
+        if not config["ASYNC_DATABASE_URL"]:
+            config["ASYNC_DATABASE_URL"] = async_url(
+                config["SQLALCHEMY_DATABASE_URI"]
+            )
+        if config.get("DATABASE_REPLICA_URL"):
+            config["ASYNC_REPLICA_URL"] = async_url(
+                config["DATABASE_REPLICA_URL"]
+            )
+        if config["ASYNC_ENGINE_OPTIONS"] is None:
+            url = make_url(config["ASYNC_DATABASE_URL"])
+            if url.get_backend_name() == "postgresql":
+                options = engine_options(config, asyncpg=True)
+            else:
+                options = {}
+            config["ASYNC_ENGINE_OPTIONS"] = options
+        app.extensions["async_database"] = self
+        app.async_to_sync = self.async_to_sync
+
+    def engines(self):
+        """(name, engine) of the current app's engines created so far."""
+        config = current_app.config
+        names = {
+            config["ASYNC_DATABASE_URL"]: "async primary",
+            config.get("ASYNC_REPLICA_URL"): "async replica",
+        }
+        return [
+            (names[url], engine)
+            for url, engine in list(self._engines.items())
+            if url in names
+        ]
+
+    @property
+    def dialect(self):
+        """The name of the current app's database, e.g. "postgresql"."""
+        url = make_url(current_app.config["ASYNC_DATABASE_URL"])
+        return url.get_backend_name()
+
+    @property
+    def loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever,
+                    name="async-database",
+                    daemon=True,
+                ).start()
+            return self._loop
+
+    def async_to_sync(self, func):
+        """Run a coroutine function on the event loop of the calling thread.
+
+        Replaces Flask's default, which starts a new event loop in a new
+        thread on every call (through asgiref), for each worker thread
+        reusing one loop. The coroutine runs in the calling thread, so it
+        sees the app and request contexts.
+        """
+
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            loop = getattr(self._local, "loop", None)
+            if loop is None:
+                loop = self._local.loop = asyncio.new_event_loop()
+            return loop.run_until_complete(func(*args, **kwargs))
+
+        return run
+
+    def _engine(self, url, options):
+        # only ever called on self.loop
+        if url not in self._engines:
+            # optional dependency, only needed with ASYNC_VIEWS
+            from sqlalchemy.ext.asyncio import create_async_engine
+
+            self._engines[url] = create_async_engine(url, **options)
+        return self._engines[url]
+
+    async def _execute(self, url, options, statements):
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        engine = self._engine(url, options)
+
+        async def execute(statement):
+            # results come back buffered, so they outlive the session
+            async with AsyncSession(engine) as session:
+                return await session.execute(statement)
+
+        return await asyncio.gather(*map(execute, statements))
+
+    async def gather(self, *statements):
+        """Run statements concurrently; returns their results, in order.
+
+        They go to the replica when database.use_replica says so.
+        The results are buffered SQLAlchemy Results: .all(), .first(),
+        .scalars() and so on work as with Session.execute.
+        """
+        config = current_app.config
+        url = config["ASYNC_DATABASE_URL"]
+        if config.get("ASYNC_REPLICA_URL") and use_replica():
+            url = config["ASYNC_REPLICA_URL"]
+        # the coroutine runs in a copy of this context, so the app and
+        # request contexts stay current there: metrics.RequestMetrics
+        # counts its statements for this request
+        future = asyncio.run_coroutine_threadsafe(
+            self._execute(
+                url,
+                config["ASYNC_ENGINE_OPTIONS"],
+                statements,
+            ),
+            self.loop,
+        )
+        return await asyncio.wrap_future(future)
+
+    async def execute(self, statement):
+        """Run one statement, like Session.execute."""
+        (result,) = await self.gather(statement)
+        return result
@@ -0,0 +1,76 @@
+"""Micro-benchmark of the ``datetime`` Jinja filter.
+
+Compares the previous filter (dateutil-parse a string, let babel resolve
+the pattern and locale on every call) with the current one on a page
+worth of show times:
+
+    python benchmarks/bench_format_datetime.py [--shows 500] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+import babel.dates
+import dateutil.parser
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+from app import create_app  # noqa: E402
+from filters import format_datetime  # noqa: E402
+
+
+def old_format_datetime(value, format="medium"):
+    date = dateutil.parser.parse(value)
+    if format == "full":
+        format = "EEE MM, d, y 'at' h:mma"
+    elif format == "medium":
+        format = "EE MM, dd, y h:mma"
+    return babel.dates.format_datetime(date, format, locale="en_US")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    start = datetime(2020, 8, 21, 20, 0)
+    times = [start + timedelta(hours=7 * i) for i in range(args.shows)]
+    strings = [str(value) for value in times]
+
+    app = create_app({"TESTING": True})
+    with app.test_request_context("/shows"):
+        app.preprocess_request()
+        assert [old_format_datetime(s, "full") for s in strings] == [
+            format_datetime(t, "full") for t in times
+        ]
+        old = min(
+            timeit.repeat(
+                lambda: [old_format_datetime(s, "full") for s in strings],
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        new = min(
+            timeit.repeat(
+                lambda: [format_datetime(t, "full") for t in times],
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+    print("{} show times, best of {}".format(args.shows, args.repeat))
+    for name, seconds in (("old", old), ("new", new)):
+        print(
+            "{}: {:8.2f} ms  {:10.0f} calls/s".format(
+                name, seconds * 1e3, args.shows / seconds
+            )
+        )
+    print("speedup: {:.1f}x".format(old / new))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark of ``flask import`` on generated data.
+
+Writes --rows venues and as many shows (over --rows // 10 venues and
+artists) to temporary CSV files and imports them into --database, which
+defaults to a fresh SQLite file:
+
+    python benchmarks/bench_import.py [--rows 100000] [--batch-size 1000]
+        [--database postgresql://localhost/fyyur_bench]
+
+Use an empty scratch database: the schema is created with create_all.
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+from app import create_app  # noqa: E402
+from models import db  # noqa: E402
+
+GENRES = ["Jazz", "Blues", "Folk", "Rock n Roll", "Soul", "Funk"]
+
+
+def write_csv(path, header, rows):
+    with open(path, "w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def entity_rows(count, extra):
+    for i in range(count):
+        yield [
+            "Name {}".format(i),
+            "City {}".format(i % 97),
+            "CA",
+            "555-{:04d}".format(i % 10000),
+            "https://example.com/{}.jpg".format(i),
+            ";".join(GENRES[i % 3 : i % 3 + 2]),
+            "https://example.com/{}".format(i),
+            "https://facebook.com/{}".format(i),
+            "yes" if i % 2 else "no",
+            "Looking for {}".format(i),
+        ] + extra(i)
+
+
+def show_rows(count, entities):
+    start = datetime(2020, 1, 1)
+    for i in range(count):
+        # spread over time so no artist or venue is booked twice in a slot
+        yield [
+            i % entities + 1,
+            (i * 7) % entities + 1,
+            start + timedelta(hours=4 * (i // entities) + (i % 5) * 5),
+        ]
+
+
+def run(runner, kind, path, batch_size, rows):
+    started = time.perf_counter()
+    result = runner.invoke(
+        args=["import", kind, path, "--batch-size", str(batch_size)]
+    )
+    elapsed = time.perf_counter() - started
+    summary = [
+        line for line in result.output.splitlines() if " imported, " in line
+    ]
+    print(summary[-1] if summary else result.output or result.exception)
+    print(
+        "{:8}: {:8} rows in {:7.2f}s  {:9.0f} rows/s".format(
+            kind, rows, elapsed, rows / elapsed
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--database")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fyyur-bench-")
+    database = args.database or "sqlite:///" + os.path.join(
+        workdir, "bench.db"
+    )
+    app = create_app({"SQLALCHEMY_DATABASE_URI": database, "TESTING": True})
+    header = [
+        "name", "city", "state", "phone", "image_link", "genres",
+        "website", "facebook_link",
+    ]
+    entities = max(1, args.rows // 10)
+    venues = os.path.join(workdir, "venues.csv")
+    write_csv(
+        venues,
+        header + ["seeking_talent", "seeking_description", "address"],
+        entity_rows(args.rows, lambda i: ["{} Main St".format(i)]),
+    )
+    artists = os.path.join(workdir, "artists.csv")
+    write_csv(
+        artists,
+        header + ["seeking_venue", "seeking_description"],
+        entity_rows(entities, lambda i: []),
+    )
+    shows = os.path.join(workdir, "shows.csv")
+    write_csv(
+        shows,
+        ["artist_id", "venue_id", "start_time"],
+        show_rows(args.rows, entities),
+    )
+
+    with app.app_context():
+        db.create_all()
+    runner = app.test_cli_runner()
+    run(runner, "venues", venues, args.batch_size, args.rows)
+    run(runner, "artists", artists, args.batch_size, entities)
+    run(runner, "shows", shows, args.batch_size, args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Benchmark of every page and endpoint on the synthetic dataset.
+
+Seeds a database with benchmarks/dataset.py (same arguments), then times
+each route through the Flask test client, both with an empty page cache
+("cold", what a cache miss costs) and with the cache filled ("warm"), and
+counts its SQL statements. Results are printed and, with --output, saved
+as JSON that compare.py can diff between commits, or between the sync
+views and the async ones (--async-views):
+
+    python benchmarks/bench_routes.py [--repeat 30] [--output before.json]
+        [--database postgresql://localhost/fyyur_bench] [--async-views]
+        [dataset options]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+import dataset  # noqa: E402
+from models import db  # noqa: E402
+from pages import cache  # noqa: E402
+
+# (method, url, form data); id 1 is the busiest venue and artist, {venue}
+# and {artist} one from the middle of the dataset
+ROUTES = [
+    ("GET", "/", None),
+    ("GET", "/venues", None),
+    ("GET", "/venues?limit=200", None),
+    ("GET", "/venues/1", None),
+    ("GET", "/venues/{venue}", None),
+    ("GET", "/venues/genres/Jazz", None),
+    ("POST", "/venues/search", {"search_term": "blue"}),
+    ("GET", "/venues/1/edit", None),
+    ("GET", "/artists", None),
+    ("GET", "/artists/1", None),
+    ("GET", "/artists/{artist}", None),
+    ("GET", "/artists/genres/Jazz", None),
+    ("POST", "/artists/search", {"search_term": "band"}),
+    ("GET", "/artists/1/edit", None),
+    ("GET", "/shows", None),
+    ("GET", "/search?q=blue", None),
+    ("GET", "/api/v1/venues?embed=shows", None),
+    ("GET", "/api/v1/shows?embed=venue,artist&limit=200", None),
+    ("GET", "/api/v1/artists?ids=1,2,3,4,5&fields=id,name,genres", None),
+    ("GET", "/export/venues.csv", None),
+]
+
+
+class QueryCounter(object):
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self.increment)
+
+    def increment(self, *args):
+        self.count += 1
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def time_route(client, counter, method, url, data, repeat, cold):
+    timings = []
+    statuses = set()
+    counter.count = 0
+    for _ in range(repeat):
+        if cold:
+            cache.store.clear()
+        started = time.perf_counter()
+        response = client.open(url, method=method, data=data)
+        response.get_data()
+        timings.append(time.perf_counter() - started)
+        statuses.add(response.status_code)
+    return {
+        "statuses": sorted(statuses),
+        "mean_ms": statistics.mean(timings) * 1e3,
+        "median_ms": statistics.median(timings) * 1e3,
+        "p95_ms": percentile(timings, 0.95) * 1e3,
+        "queries": counter.count / repeat,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    dataset.add_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--output")
+    parser.add_argument("--async-views", action="store_true")
+    args = parser.parse_args()
+
+    app, _ = dataset.create_bench_app(
+        args.database,
+        WTF_CSRF_ENABLED=False,
+        METRICS_QUERY_BUDGET=None,
+        ASYNC_VIEWS=args.async_views,
+    )
+    results = {}
+    with app.app_context():
+        dataset.seed(
+            args.venues, args.artists, args.shows, args.skew, args.seed
+        )
+        dialect = db.engine.dialect.name
+        # every engine, so the async views' statements count too
+        counter = QueryCounter(Engine)
+        client = app.test_client()
+        ids = {
+            "venue": max(1, args.venues // 2),
+            "artist": max(1, args.artists // 2),
+        }
+        for method, url, data in ROUTES:
+            url = url.format(**ids)
+            # once untimed so templates are compiled and caches primed
+            client.open(url, method=method, data=data)
+            name = "{} {}".format(method, url)
+            results[name] = {
+                "cold": time_route(
+                    client, counter, method, url, data, args.repeat, True
+                ),
+                "warm": time_route(
+                    client, counter, method, url, data, args.repeat, False
+                ),
+            }
+            print(
+                "{:56} cold {:8.2f} ms {:4.1f} queries  warm {:8.2f} ms "
+                "{:4.1f} queries".format(
+                    name,
+                    results[name]["cold"]["median_ms"],
+                    results[name]["cold"]["queries"],
+                    results[name]["warm"]["median_ms"],
+                    results[name]["warm"]["queries"],
+                )
+            )
+            statuses = sorted(
+                set(results[name]["cold"]["statuses"])
+                | set(results[name]["warm"]["statuses"])
+            )
+            if statuses != [200]:
+                # timed anyway, but not comparable with a 200
+                print("    answered {}".format(statuses))
+
+    if args.output:
+        report = {
+            "meta": {
+                "commit": git_commit(),
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "database": dialect,
+                "dataset": {
+                    "venues": args.venues,
+                    "artists": args.artists,
+                    "shows": args.shows,
+                    "skew": args.skew,
+                    "seed": args.seed,
+                },
+                "repeat": args.repeat,
+                "async_views": args.async_views,
+            },
+            "routes": results,
+        }
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+        print("results written to", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Cold start time of a worker: importing app and running create_app.
+
+Starts --repeat fresh interpreters that import the app and build it, the
+way a gunicorn worker or a serverless instance does on boot, and prints
+the median time, then the slowest imports (from python -X importtime).
+Exits with status 1 when the median is over --budget-ms, so CI can catch
+an import that makes start-up slow again:
+
+    python benchmarks/bench_startup.py [--repeat 10] [--budget-ms 600]
+        [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# prints the seconds import + create_app took
+STARTUP = """
+import time
+started = time.perf_counter()
+from app import create_app
+create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+print(time.perf_counter() - started)
+"""
+
+
+def run(*options):
+    environ = dict(os.environ, SECRET_KEY="bench", FLASK_DEBUG="1")
+    environ.pop("FLASK_RUN_FROM_CLI", None)
+    return subprocess.run(
+        [sys.executable, *options, "-c", STARTUP],
+        cwd=ROOT,
+        env=environ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def slowest_imports(top):
+    # (cumulative microseconds, module) of what app imports and what these
+    # import in turn; a package is charged to the first module importing it
+    imports = []
+    for line in run("-X", "importtime").stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        depth = (len(module) - len(module.lstrip()) - 1) // 2
+        if 1 <= depth <= 2:
+            imports.append((int(cumulative), module.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=600)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    timings = [float(run().stdout) for _ in range(args.repeat)]
+    median = statistics.median(timings) * 1e3
+    print(
+        "import app + create_app: median {:.1f} ms, min {:.1f} ms "
+        "({} runs, budget {:.0f} ms)".format(
+            median, min(timings) * 1e3, args.repeat, args.budget_ms
+        )
+    )
+    print("slowest imports (cumulative):")
+    for cumulative, module in slowest_imports(args.top):
+        print("{:10.1f} ms  {}".format(cumulative / 1e3, module))
+    if median > args.budget_ms:
+        raise SystemExit(
+            "cold start {:.1f} ms is over the budget of {:.0f} ms".format(
+                median, args.budget_ms
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
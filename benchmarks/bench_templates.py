@@ -0,0 +1,140 @@
+"""First-request latency of the pages, by how templates are loaded.
+
+Seeds a database with benchmarks/dataset.py (same arguments), then for
+each setup starts --repeat fresh interpreters that build the app and
+request every page once, as the first requests a worker serves after a
+deploy. Prints the median start-up time (import and create_app) and
+first-request time of each page:
+
+- compile: no bytecode cache, no bundle, no warm-up (the old behaviour)
+- bytecode cache: TEMPLATE_CACHE_DIR filled by an earlier process
+- bundle: templates precompiled by flask compile-templates
+- bundle + warm-up: the same, all templates loaded by create_app
+
+    python benchmarks/bench_templates.py [--repeat 10] [dataset options]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+import dataset  # noqa: E402
+from templating import compile_bundle  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = [
+    "/",
+    "/venues",
+    "/venues/1",
+    "/venues/1/edit",
+    "/artists",
+    "/artists/1",
+    "/shows",
+    "/shows/create",
+]
+
+# prints the seconds create_app and the first request of each page took
+FIRST_REQUESTS = """
+import json, sys, time
+config, pages = json.loads(sys.argv[1]), json.loads(sys.argv[2])
+started = time.perf_counter()
+from app import create_app
+app = create_app(config)
+timings = {"startup": time.perf_counter() - started}
+client = app.test_client()
+for page in pages:
+    started = time.perf_counter()
+    response = client.get(page)
+    timings[page] = time.perf_counter() - started
+    assert response.status_code == 200, (page, response.status_code)
+print(json.dumps(timings))
+"""
+
+
+def first_requests(config, workdir):
+    # debug off, as deployed; error.log goes to workdir
+    environ = dict(os.environ, SECRET_KEY="bench", FLASK_DEBUG="0")
+    environ.pop("FLASK_RUN_FROM_CLI", None)
+    environ["PYTHONPATH"] = ROOT
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            FIRST_REQUESTS,
+            json.dumps(config),
+            json.dumps(PAGES),
+        ],
+        cwd=workdir,
+        env=environ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(process.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    dataset.add_arguments(parser)
+    args = parser.parse_args()
+
+    app, database = dataset.create_bench_app(args.database)
+    with app.app_context():
+        dataset.seed(
+            args.venues, args.artists, args.shows, args.skew, args.seed
+        )
+    workdir = tempfile.mkdtemp(prefix="fyyur-templates-")
+    bundle = os.path.join(workdir, "bundle")
+    compile_bundle(app, bundle)
+    base = {
+        "SQLALCHEMY_DATABASE_URI": database,
+        "TESTING": True,
+        "TEMPLATE_CACHE_DIR": None,
+        "TEMPLATE_BUNDLE": None,
+        "TEMPLATE_WARM_UP": False,
+    }
+    cache_dir = os.path.join(workdir, "cache")
+    setups = [
+        ("compile", base),
+        ("bytecode cache", dict(base, TEMPLATE_CACHE_DIR=cache_dir)),
+        ("bundle", dict(base, TEMPLATE_BUNDLE=bundle)),
+        (
+            "bundle + warm-up",
+            dict(base, TEMPLATE_BUNDLE=bundle, TEMPLATE_WARM_UP=True),
+        ),
+    ]
+    # fills the bytecode cache, and the OS file cache for everybody
+    first_requests(setups[1][1], workdir)
+
+    columns = ["startup"] + PAGES
+    print("median ms over {} processes".format(args.repeat))
+    print(
+        "{:<18}".format("")
+        + "".join("{:>15}".format(column) for column in columns + ["total"])
+    )
+    for name, config in setups:
+        runs = [first_requests(config, workdir) for _ in range(args.repeat)]
+        medians = [
+            statistics.median(run[column] for run in runs) * 1e3
+            for column in columns
+        ]
+        print(
+            "{:<18}".format(name)
+            + "".join(
+                "{:>15.1f}".format(median)
+                for median in medians + [sum(medians)]
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compare two JSON results of bench_routes.py or load.py.
+
+Prints the median (or p50) latency of every route in both runs and the
+change, flagging changes beyond --threshold percent:
+
+    python benchmarks/compare.py before.json after.json [--threshold 10]
+"""
+import argparse
+import json
+
+
+def medians(report):
+    # {"route mode": median ms} from either kind of result file
+    values = {}
+    for route, modes in report["routes"].items():
+        for mode, figures in modes.items():
+            median = figures.get("median_ms", figures.get("p50_ms"))
+            if median is not None:
+                values["{} [{}]".format(route, mode)] = median
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10)
+    args = parser.parse_args()
+
+    with open(args.before) as before_file, open(args.after) as after_file:
+        before_report = json.load(before_file)
+        after_report = json.load(after_file)
+    before = medians(before_report)
+    after = medians(after_report)
+    print(
+        "{} -> {}".format(
+            before_report["meta"].get("commit"),
+            after_report["meta"].get("commit"),
+        )
+    )
+    for name in sorted(set(before) | set(after)):
+        if name not in before or name not in after:
+            only_in = "before" if name in before else "after"
+            print("{:72} only in {}".format(name, only_in))
+            continue
+        change = (after[name] - before[name]) / before[name] * 100
+        flag = ""
+        if change > args.threshold:
+            flag = "  slower"
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(
+            "{:72} {:8.2f} -> {:8.2f} ms  {:+6.1f}%{}".format(
+                name, before[name], after[name], change, flag
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Deterministic synthetic dataset for the benchmarks.
+
+Seeds --venues venues, --artists artists and --shows shows into
+--database (a fresh SQLite file by default). Show counts follow a Zipf-like
+law with exponent --skew: a few venues and artists get most of the shows,
+as in real listings. The same arguments always give the same rows.
+
+    python benchmarks/dataset.py [--venues 1000] [--artists 1000]
+        [--shows 20000] [--skew 1.1] [--seed 0]
+        [--database postgresql://localhost/fyyur_bench]
+
+SQLite databases get their schema from create_all. PostgreSQL ones must be
+empty and migrated (flask db upgrade) so the search triggers and the show
+count views exist.
+"""
+import argparse
+import bisect
+import itertools
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+from app import create_app  # noqa: E402
+from models import (  # noqa: E402
+    SHOW_SLOT_HOURS,
+    Artist,
+    Genre,
+    Show,
+    Venue,
+    artist_genre,
+    db,
+    refresh_show_counts,
+    venue_genre,
+)
+
+GENRES = [
+    "Alternative", "Blues", "Classical", "Country", "Electronic", "Folk",
+    "Funk", "Hip-Hop", "Heavy Metal", "Instrumental", "Jazz",
+    "Musical Theatre", "Pop", "Punk", "R&B", "Reggae", "Rock n Roll", "Soul",
+]
+STATES = ["CA", "NY", "TX", "WA", "IL", "FL", "MA", "OR"]
+WORDS = [
+    "Blue", "Red", "Golden", "Silver", "Wild", "Quiet", "Electric",
+    "Velvet", "Midnight", "Sunset", "Iron", "Crystal", "Lucky", "Hidden",
+    "Copper", "Neon",
+]
+PLACES = ["Hall", "Room", "Club", "Lounge", "Garden", "Theatre", "Bar"]
+BANDS = ["Band", "Trio", "Collective", "Orchestra", "Quartet", "Project"]
+
+
+def add_arguments(parser):
+    parser.add_argument("--venues", type=int, default=1000)
+    parser.add_argument("--artists", type=int, default=1000)
+    parser.add_argument("--shows", type=int, default=20000)
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database")
+
+
+def create_bench_app(database, **config):
+    """The app on database, a fresh SQLite file if None, and its URL."""
+    if not database:
+        workdir = tempfile.mkdtemp(prefix="fyyur-bench-")
+        database = "sqlite:///" + os.path.join(workdir, "bench.db")
+    config.update(SQLALCHEMY_DATABASE_URI=database, TESTING=True)
+    return create_app(config), database
+
+
+def zipf_picker(rng, count, skew):
+    # ids 1..count, id 1 the most likely
+    weights = itertools.accumulate(
+        1 / rank ** skew for rank in range(1, count + 1)
+    )
+    cumulative = list(weights)
+    total = cumulative[-1]
+    return lambda: bisect.bisect(cumulative, rng.random() * total) + 1
+
+
+def entity_row(rng, i, suffixes):
+    name = "{} {} {}".format(
+        rng.choice(WORDS), rng.choice(WORDS), rng.choice(suffixes)
+    )
+    return {
+        "id": i,
+        "name": "{} {}".format(name, i),
+        "city": "City {}".format(rng.randrange(50)),
+        "state": rng.choice(STATES),
+        "phone": "555-{:03d}-{:04d}".format(
+            rng.randrange(1000), rng.randrange(10000)
+        ),
+        "image_link": "https://example.com/images/{}.jpg".format(i),
+        "facebook_link": "https://www.facebook.com/{}".format(i),
+        "website": "https://example.com/{}".format(i),
+        "seeking_description": "We are looking for {} acts".format(
+            rng.choice(GENRES)
+        ),
+    }
+
+
+def generate(venues, artists, shows, skew=1.1, seed=0, now=None):
+    """Build the rows of the dataset as dicts, per table.
+
+    Shows fall in the year around now (midnight today by default), never
+    closer than SHOW_SLOT_HOURS for one artist or venue.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.combine(datetime.today(), datetime.min.time())
+    updated_at = now - timedelta(days=400)
+    genre_ids = range(1, len(GENRES) + 1)
+    rows = {
+        "genre": [
+            {"id": i, "name": name} for i, name in enumerate(GENRES, 1)
+        ],
+        "venue": [],
+        "artist": [],
+        "venue_genre": [],
+        "artist_genre": [],
+        "show": [],
+    }
+    for i in range(1, venues + 1):
+        row = entity_row(rng, i, PLACES)
+        row["address"] = "{} Main Street".format(rng.randrange(1, 2000))
+        row["seeking_talent"] = rng.random() < 0.3
+        row["updated_at"] = updated_at
+        rows["venue"].append(row)
+        for genre_id in rng.sample(genre_ids, rng.randint(1, 3)):
+            rows["venue_genre"].append({"venue_id": i, "genre_id": genre_id})
+    for i in range(1, artists + 1):
+        row = entity_row(rng, i, BANDS)
+        row["seeking_venue"] = rng.random() < 0.3
+        row["updated_at"] = updated_at
+        rows["artist"].append(row)
+        for genre_id in rng.sample(genre_ids, rng.randint(1, 3)):
+            rows["artist_genre"].append({"artist_id": i, "genre_id": genre_id})
+
+    pick_venue = zipf_picker(rng, venues, skew)
+    pick_artist = zipf_picker(rng, artists, skew)
+    slot = timedelta(hours=SHOW_SLOT_HOURS)
+    start = now - timedelta(days=180)
+    # next free time of each venue and artist
+    venue_free = {}
+    artist_free = {}
+    for i in range(1, shows + 1):
+        venue_id = pick_venue()
+        artist_id = pick_artist()
+        start_time = max(
+            start + timedelta(hours=rng.randrange(365 * 24)),
+            venue_free.get(venue_id, start),
+            artist_free.get(artist_id, start),
+        )
+        venue_free[venue_id] = artist_free[artist_id] = start_time + slot
+        rows["show"].append(
+            {
+                "id": i,
+                "venue_id": venue_id,
+                "artist_id": artist_id,
+                "start_time": start_time,
+                "updated_at": updated_at,
+            }
+        )
+    return rows
+
+
+def seed(venues, artists, shows, skew=1.1, seed=0, now=None):
+    """Insert the dataset into the app's database, inside an app context."""
+    if db.engine.dialect.name != "postgresql":
+        db.create_all()
+    rows = generate(venues, artists, shows, skew, seed, now)
+    tables = (
+        (Genre.__table__, "genre"),
+        (Venue.__table__, "venue"),
+        (Artist.__table__, "artist"),
+        (venue_genre, "venue_genre"),
+        (artist_genre, "artist_genre"),
+        (Show.__table__, "show"),
+    )
+    for table, name in tables:
+        for offset in range(0, len(rows[name]), 5000):
+            batch = rows[name][offset : offset + 5000]
+            db.session.execute(table.insert(), batch)
+    if db.engine.dialect.name == "postgresql":
+        # ids were given explicitly, move the sequences past them
+        for table, name in tables:
+            if "id" in table.columns:
+                db.session.execute(
+                    db.text(
+                        "SELECT setval(pg_get_serial_sequence('{0}', 'id'), "
+                        "(SELECT max(id) FROM {0}))".format(table.name)
+                    )
+                )
+    db.session.commit()
+    refresh_show_counts()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args()
+    app, database = create_bench_app(args.database)
+    with app.app_context():
+        rows = seed(
+            args.venues, args.artists, args.shows, args.skew, args.seed
+        )
+    print(
+        "{} venues, {} artists, {} shows in {}".format(
+            len(rows["venue"]),
+            len(rows["artist"]),
+            len(rows["show"]),
+            database,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
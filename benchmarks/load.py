@@ -0,0 +1,210 @@
+"""Local load test: simulated visitors browsing Fyyur concurrently.
+
+--users threads each loop over a weighted mix of visitor actions (home
+page, listings, busy and quiet detail pages, searches) with --think
+seconds between requests, for --duration seconds. By default they hit the
+app in process, on a database seeded by benchmarks/dataset.py (same
+arguments); with --url they hit a running server instead, which must hold
+a dataset of at least the given sizes. Prints throughput and latency
+percentiles per action, and saves them as JSON with --output.
+--async-views runs the app in process with ASYNC_VIEWS on, to compare the
+async views with the sync ones through compare.py:
+
+    python benchmarks/load.py [--users 10] [--duration 30] [--think 0]
+        [--url http://localhost:5000 | --async-views] [--output load.json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+import dataset  # noqa: E402
+from bench_routes import git_commit, percentile  # noqa: E402
+
+SEARCH_WORDS = ["blue", "jazz", "hall", "band", "velvet", "club", "neon"]
+
+
+def scenario(rng, pick_venue, pick_artist):
+    # (weight, action name, method, url, form data) of each visitor action
+    word = rng.choice(SEARCH_WORDS)
+    return [
+        (10, "home", "GET", "/", None),
+        (15, "venues", "GET", "/venues", None),
+        (8, "artists", "GET", "/artists", None),
+        (10, "shows", "GET", "/shows", None),
+        (20, "venue", "GET", "/venues/{}".format(pick_venue()), None),
+        (15, "artist", "GET", "/artists/{}".format(pick_artist()), None),
+        (7, "venue search", "POST", "/venues/search", {"search_term": word}),
+        (5, "search", "GET", "/search?q=" + word, None),
+        (5, "api venues", "GET", "/api/v1/venues?embed=shows", None),
+        (5, "genre", "GET", "/artists/genres/Jazz", None),
+    ]
+
+
+class AppClient(object):
+    # the app in process, one test client per visitor
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, url, data):
+        response = self.client.open(url, method=method, data=data)
+        response.get_data()
+        return response.status_code
+
+
+class HTTPClient(object):
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+
+    def request(self, method, url, data):
+        body = urllib.parse.urlencode(data).encode() if data else None
+        request = urllib.request.Request(
+            self.base_url + url, data=body, method=method
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            return error.code
+
+
+def visitor(client, args, seed, deadline, results, lock):
+    rng = random.Random(seed)
+    pick_venue = dataset.zipf_picker(rng, args.venues, args.skew)
+    pick_artist = dataset.zipf_picker(rng, args.artists, args.skew)
+    while time.monotonic() < deadline:
+        actions = scenario(rng, pick_venue, pick_artist)
+        weight, name, method, url, data = rng.choices(
+            actions, weights=[action[0] for action in actions]
+        )[0]
+        started = time.perf_counter()
+        try:
+            status = client.request(method, url, data)
+        except OSError:
+            status = None
+        elapsed = time.perf_counter() - started
+        with lock:
+            figures = results.setdefault(name, {"timings": [], "errors": 0})
+            figures["timings"].append(elapsed)
+            if status != 200:
+                figures["errors"] += 1
+        if args.think:
+            time.sleep(rng.expovariate(1 / args.think))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    dataset.add_arguments(parser)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--think", type=float, default=0)
+    parser.add_argument("--url")
+    parser.add_argument("--async-views", action="store_true")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    if args.url:
+        clients = [HTTPClient(args.url) for _ in range(args.users)]
+        target = args.url
+    else:
+        app, target = dataset.create_bench_app(
+            args.database,
+            WTF_CSRF_ENABLED=False,
+            METRICS_QUERY_BUDGET=None,
+            ASYNC_VIEWS=args.async_views,
+        )
+        with app.app_context():
+            dataset.seed(
+                args.venues, args.artists, args.shows, args.skew, args.seed
+            )
+        clients = [AppClient(app) for _ in range(args.users)]
+
+    results = {}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(
+            target=visitor,
+            args=(client, args, args.seed + i, deadline, results, lock),
+        )
+        for i, client in enumerate(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    routes = {}
+    total = errors = 0
+    for name, figures in sorted(results.items()):
+        timings = figures["timings"]
+        total += len(timings)
+        errors += figures["errors"]
+        routes[name] = {
+            "load": {
+                "requests": len(timings),
+                "errors": figures["errors"],
+                "rps": len(timings) / elapsed,
+                "mean_ms": statistics.mean(timings) * 1e3,
+                "p50_ms": percentile(timings, 0.5) * 1e3,
+                "p95_ms": percentile(timings, 0.95) * 1e3,
+                "p99_ms": percentile(timings, 0.99) * 1e3,
+            }
+        }
+        load = routes[name]["load"]
+        print(
+            "{:14} {:6d} req {:4d} err {:7.1f} req/s  p50 {:8.2f} ms  "
+            "p95 {:8.2f} ms  p99 {:8.2f} ms".format(
+                name,
+                load["requests"],
+                load["errors"],
+                load["rps"],
+                load["p50_ms"],
+                load["p95_ms"],
+                load["p99_ms"],
+            )
+        )
+    print(
+        "{} requests, {} errors in {:.1f}s: {:.1f} req/s with {} users".format(
+            total, errors, elapsed, total / elapsed, args.users
+        )
+    )
+
+    if args.output:
+        report = {
+            "meta": {
+                "commit": git_commit(),
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "target": target,
+                "async_views": args.async_views,
+                "users": args.users,
+                "duration": args.duration,
+                "think": args.think,
+                "requests": total,
+                "errors": errors,
+                "rps": total / elapsed,
+            },
+            "routes": routes,
+        }
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+        print("results written to", args.output)
+
+
+if __name__ == "__main__":
+    main()
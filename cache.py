@@ -0,0 +1,318 @@
+import fcntl
+import hashlib
+import itertools
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """Thread-safe LRU cache with a per-entry time to live.
+
+    Keeps at most maxsize entries, evicting the least recently used one,
+    and counts hits, misses and evictions for monitoring.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            del self._data[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def _set(self, key, value, ttl):
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        with self._lock:
+            return self._get(key)
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        with self._lock:
+            if self._get(key) is not None:
+                return False
+            self._set(key, value, ttl)
+            return True
+
+    def incr(self, key, ttl=None):
+        with self._lock:
+            value = (self._get(key) or 0) + 1
+            self._set(key, value, ttl)
+            return value
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class FileSystemCache(object):
+    """Cache shared by the workers of one node through a directory.
+
+    Each key is a pickle file named after its hash; add/incr hold an
+    exclusive flock so concurrent workers don't lose updates.
+    """
+
+    def __init__(self, directory, ttl=300):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+        self._lock_path = os.path.join(directory, ".lock")
+
+    def _path(self, key):
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, name)
+
+    def _locked(self):
+        lock_file = open(self._lock_path, "a")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as cache_file:
+                expires, value = pickle.load(cache_file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if expires < time.time():
+            self.delete(key)
+            return None
+        return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        path = self._path(key)
+        # write then rename so readers never see a partial file
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        with open(tmp_path, "wb") as cache_file:
+            pickle.dump((time.time() + ttl, value), cache_file)
+        os.replace(tmp_path, path)
+
+    def add(self, key, value, ttl=None):
+        with self._locked():
+            if self.get(key) is not None:
+                return False
+            self.set(key, value, ttl)
+            return True
+
+    def incr(self, key, ttl=None):
+        with self._locked():
+            value = (self.get(key) or 0) + 1
+            self.set(key, value, ttl)
+            return value
+
+    def delete(self, *keys):
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name != ".lock":
+                os.remove(os.path.join(self.directory, name))
+
+    def stats(self):
+        return {"size": len(os.listdir(self.directory)) - 1}
+
+
+class RedisCache(object):
+    """Cache shared by every worker on every node through a Redis server.
+
+    The database may hold other data: clear() only deletes the keys
+    starting with prefix.
+    """
+
+    def __init__(self, url, ttl=300, client=None, prefix="fyyur"):
+        if client is None:
+            # optional dependency, only needed with CACHE_BACKEND = "redis"
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _dumps(self, value):
+        # ints are stored as plain numbers so INCR can work on them
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value)
+        return pickle.dumps(value)
+
+    def _loads(self, value):
+        if value.lstrip(b"-").isdigit():
+            return int(value)
+        return pickle.loads(value)
+
+    def get(self, key):
+        value = self.client.get(key)
+        return None if value is None else self._loads(value)
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        self.client.set(key, self._dumps(value), ex=ttl)
+
+    def add(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        return bool(self.client.set(key, self._dumps(value), ex=ttl, nx=True))
+
+    def incr(self, key, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        with self.client.pipeline() as pipe:
+            pipe.incr(key)
+            pipe.expire(key, ttl)
+            return pipe.execute()[0]
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*keys)
+
+    def clear(self):
+        # SCAN rather than KEYS, which would block the server meanwhile
+        keys = self.client.scan_iter(match=self.prefix + ":*", count=1000)
+        while True:
+            batch = list(itertools.islice(keys, 1000))
+            if not batch:
+                break
+            self.client.delete(*batch)
+
+    def stats(self):
+        return {"size": self.client.dbsize()}
+
+
+class Cache(object):
+    """Namespaced cache with versioned keys over one of the stores above.
+
+    Every key lives in a namespace (e.g. "venue:1" or "listings") whose
+    current version is part of the stored key, so invalidate() only has to
+    bump the version to orphan every entry of the namespace in every
+    worker sharing the store; orphans then age out through their TTL.
+    """
+
+    def __init__(self, store=None, prefix="fyyur", version_ttl=86400):
+        self.store = store
+        self.prefix = prefix
+        self.version_ttl = version_ttl
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        # for a cache created before the app, like the one in pages.py
+        self.store = create_store(app.config)
+        self.prefix = app.config.get("CACHE_KEY_PREFIX", "fyyur")
+
+    def _version_key(self, namespace):
+        return "{}:version:{}".format(self.prefix, namespace)
+
+    def key(self, namespace, key):
+        """The stored key of key in namespace, under its current version.
+
+        Take it before reading the data to cache and hand it to both get
+        and set: if invalidate() runs in between, data read before the
+        write lands in the old version rather than the new one.
+        """
+        return "{}:{}:{}:{}".format(
+            self.prefix, namespace, self.version(namespace), key
+        )
+
+    def version(self, namespace):
+        """The current version of namespace; invalidate() changes it."""
+        version_key = self._version_key(namespace)
+        version = self.store.get(version_key)
+        if version is None:
+            # start from the clock so a lost version never rolls back onto
+            # entries written under an earlier one
+            self.store.add(
+                version_key, int(time.time() * 1000), self.version_ttl
+            )
+            version = self.store.get(version_key)
+        return version
+
+    def get(self, key):
+        value = self.store.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.store.set(key, value, ttl)
+
+    def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            version_key = self._version_key(namespace)
+            if self.store.get(version_key) is not None:
+                self.store.incr(version_key, self.version_ttl)
+
+    def stats(self):
+        return {
+            "backend": type(self.store).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "store": self.store.stats(),
+        }
+
+
+def create_store(config):
+    """Build the store selected by CACHE_BACKEND in config."""
+    backend = config.get("CACHE_BACKEND", "memory")
+    ttl = config.get("CACHE_DEFAULT_TTL", 300)
+    if backend == "memory":
+        store = LRUCache(config.get("CACHE_SIZE", 1024), ttl)
+    elif backend == "filesystem":
+        store = FileSystemCache(config["CACHE_DIR"], ttl)
+    elif backend == "redis":
+        store = RedisCache(
+            config["CACHE_REDIS_URL"],
+            ttl,
+            prefix=config.get("CACHE_KEY_PREFIX", "fyyur"),
+        )
+    else:
+        raise ValueError("Unknown CACHE_BACKEND {!r}".format(backend))
+    return store
+
+
+def create_cache(config):
+    """Build a Cache over the store selected by CACHE_BACKEND in config."""
+    return Cache(create_store(config), config.get("CACHE_KEY_PREFIX", "fyyur"))
@@ -0,0 +1,237 @@
+"""The flask import, refresh-show-counts, export, delete, compile-templates
+and build-assets commands.
+"""
+
+import time
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from exporter import (
+    EXPORT_FORMATS,
+    EXPORT_MODELS,
+    export_columns,
+    export_lines,
+    export_rows,
+)
+from models import (
+    Artist,
+    Genre,
+    Show,
+    Venue,
+    db,
+    delete_with_shows,
+    entity_deleted,
+    refresh_show_counts,
+)
+from pages import cache, invalidate_pages
+
+
+@click.command("import")
+@click.argument("kind", type=click.Choice(["venues", "artists", "shows"]))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--batch-size", default=1000, show_default=True)
+@with_appcontext
+def import_command(kind, path, batch_size):
+    """Bulk import venues, artists or shows from a CSV or JSONL file.
+
+    Rows are checked with the same forms as the create pages. In CSV files
+    genres are separated by semicolons.
+    """
+    from forms import ArtistForm, ShowForm, VenueForm
+    from importer import import_records, read_records
+
+    genres = {genre.name: genre for genre in Genre.query.all()}
+
+    def genre_rows(names):
+        for name in names:
+            if name not in genres:
+                genres[name] = Genre(name=name)
+        return [genres[name] for name in names]
+
+    def build_venue(form):
+        data = dict(form.data, genres=genre_rows(form.genres.data))
+        return Venue(**data)
+
+    def build_artist(form):
+        data = dict(form.data, genres=genre_rows(form.genres.data))
+        return Artist(**data)
+
+    venue_ids = set()
+    artist_ids = set()
+
+    def build_show(form):
+        data = dict(
+            form.data,
+            venue_id=form.venue_id.data,
+            artist_id=form.artist_id.data,
+            updated_at=datetime.utcnow(),
+        )
+        venue_ids.add(data["venue_id"])
+        artist_ids.add(data["artist_id"])
+        return data
+
+    def insert_shows(session, rows):
+        # plain executemany, no objects needed
+        session.execute(Show.__table__.insert(), rows)
+
+    form_class, build, insert = {
+        "venues": (VenueForm, build_venue, None),
+        "artists": (ArtistForm, build_artist, None),
+        "shows": (ShowForm, build_show, insert_shows),
+    }[kind]
+    started = time.perf_counter()
+    imported, invalid, failed = import_records(
+        db.session,
+        read_records(path),
+        form_class,
+        build,
+        insert,
+        batch_size=batch_size,
+        report=click.echo,
+    )
+    if kind == "shows":
+        refresh_show_counts()
+    invalidate_pages(venue_ids=venue_ids, artist_ids=artist_ids)
+    click.echo(
+        "{} {} imported, {} invalid, {} in failed batches ({:.1f}s)".format(
+            imported, kind, invalid, failed, time.perf_counter() - started
+        )
+    )
+
+
+@click.command("refresh-show-counts")
+@with_appcontext
+def refresh_show_counts_command():
+    """Recompute the upcoming/past show counts of venues and artists.
+
+    Meant to run on a schedule, e.g. every minute from cron.
+    """
+    started = time.perf_counter()
+    refresh_show_counts()
+    cache.invalidate("listings")
+    click.echo(
+        "show counts refreshed ({:.1f}s)".format(time.perf_counter() - started)
+    )
+
+
+@click.command("export")
+@click.argument("kind", type=click.Choice(list(EXPORT_MODELS)))
+@click.option(
+    "--format",
+    "format",
+    type=click.Choice(list(EXPORT_FORMATS)),
+    default="csv",
+    show_default=True,
+)
+@click.option("--output", "-o", type=click.File("w"), default="-")
+@click.option("--state")
+@click.option("--from", "start", type=click.DateTime())
+@click.option("--to", "end", type=click.DateTime())
+@click.option("--updated-since", type=click.DateTime())
+@with_appcontext
+def export_command(kind, format, output, state, start, end, updated_since):
+    """Export venues, artists or shows as CSV or JSON lines.
+
+    Writes to standard output unless --output is given. --from/--to select
+    shows by start time (venues and artists with a show then), and
+    --updated-since only rows changed since, for incremental exports.
+    """
+    model = EXPORT_MODELS[kind]
+    rows = export_rows(model, state, start, end, updated_since)
+    for line in export_lines(rows, export_columns(model), format):
+        output.write(line)
+
+
+@click.command("delete")
+@click.argument("kind", type=click.Choice(["venue", "artist"]))
+@click.argument("entity_id", type=int)
+@click.option("--batch-size", type=int)
+@with_appcontext
+def delete_command(kind, entity_id, batch_size):
+    """Delete a venue or an artist with all of its shows.
+
+    Shows go --batch-size at a time (DELETE_BATCH_SIZE by default, 0 for
+    all at once), each batch in its own transaction.
+    """
+    if batch_size is None:
+        batch_size = current_app.config["DELETE_BATCH_SIZE"]
+    model = {"venue": Venue, "artist": Artist}[kind]
+    started = time.perf_counter()
+    deleted = delete_with_shows(model, entity_id, batch_size)
+    if deleted is None:
+        raise click.ClickException("No {} {}".format(kind, entity_id))
+    name, ids = deleted
+    entity_deleted.send(model, **ids)
+    click.echo(
+        "{} {} deleted ({:.1f}s)".format(
+            kind, name, time.perf_counter() - started
+        )
+    )
+
+
+@click.command("compile-templates")
+@click.option("--output", "-o", type=click.Path(file_okay=False))
+@with_appcontext
+def compile_templates_command(output):
+    """Precompile the templates into a bundle of Python modules.
+
+    Meant for the build step of a deploy. Writes to TEMPLATE_BUNDLE unless
+    --output is given; the app loads the bundle outside debug mode, as
+    long as no template changed since.
+    """
+    from templating import compile_bundle
+
+    target = output or current_app.config["TEMPLATE_BUNDLE"]
+    started = time.perf_counter()
+    names = compile_bundle(current_app, target)
+    click.echo(
+        "{} templates compiled to {} ({:.1f}s)".format(
+            len(names), target, time.perf_counter() - started
+        )
+    )
+
+
+@click.command("build-assets")
+@click.option("--output", "-o", type=click.Path(file_okay=False))
+@with_appcontext
+def build_assets_command(output):
+    """Fingerprint, precompress and re-encode the static files.
+
+    Meant for the build step of a deploy, like compile-templates. Writes to
+    ASSET_BUILD_DIR unless --output is given; the app links to the build
+    outside debug mode, as long as no static file changed since.
+    """
+    from assets import build
+
+    target = output or current_app.config["ASSET_BUILD_DIR"]
+    started = time.perf_counter()
+    manifest = build(current_app, target)
+    click.echo(
+        "{} files, {} compressed and {} image variants built to {} "
+        "({:.1f}s)".format(
+            len(manifest["files"]),
+            sum(
+                1 for encodings in manifest["encodings"].values() if encodings
+            ),
+            sum(
+                len(variants)
+                for sources in manifest["images"].values()
+                for variants in sources.values()
+            ),
+            target,
+            time.perf_counter() - started,
+        )
+    )
+
+
+COMMANDS = [
+    import_command,
+    refresh_show_counts_command,
+    export_command,
+    delete_command,
+    compile_templates_command,
+    build_assets_command,
+]
@@ -1,16 +1,112 @@
 import os
 
-SECRET_KEY = os.urandom(32)
+# Every setting can be overridden from the environment, prefixed with FYYUR_
+# (FYYUR_PAGE_SIZE=100, values parsed as JSON), see create_app.
+
+# Signs sessions and CSRF tokens, so it must be set and shared by every
+# worker in production; debug and testing runs fall back to a random one.
+SECRET_KEY = os.environ.get("SECRET_KEY")
 # Grabs the folder where the script runs.
 basedir = os.path.abspath(os.path.dirname(__file__))
 
 # Enable debug mode.
-DEBUG = True
+DEBUG = os.environ.get("FLASK_DEBUG", "1") != "0"
 
 # Connect to the database
+SQLALCHEMY_DATABASE_URI = os.environ.get(
+    "DATABASE_URL", "postgresql://kyrayang@localhost:5432/fyyur"
+)
+
+SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+# PostgreSQL connection pool of each worker process, see database.py. Size
+# it so that workers x (DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW) stays
+# under the server's max_connections. Connections are recycled before
+# idle timeouts of the server or a load balancer can cut them, and checked
+# (pre-ping) before use.
+DATABASE_POOL_SIZE = 5
+DATABASE_MAX_OVERFLOW = 10
+DATABASE_POOL_TIMEOUT = 30
+DATABASE_POOL_RECYCLE = 1800
+DATABASE_POOL_PRE_PING = True
+# Milliseconds a statement may run before PostgreSQL cancels it, or None
+DATABASE_STATEMENT_TIMEOUT = 5000
+# Set when connecting through pgbouncer in transaction pooling mode: no
+# pool here, no startup options and no prepared statements (asyncpg).
+DATABASE_PGBOUNCER = os.environ.get("DATABASE_PGBOUNCER") == "1"
+# A read replica for the reads of GET requests; clients read from the
+# primary for DATABASE_REPLICA_STICKY seconds after they wrote something.
+DATABASE_REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL")
+DATABASE_REPLICA_STICKY = 10
+
+# Dates are shown in the best match of the browser's languages, and in the
+# zone named by a "timezone" cookie if set; start times are stored naive,
+# in STORED_TIMEZONE
+DEFAULT_LOCALE = "en_US"
+SUPPORTED_LOCALES = ["en_US"]
+STORED_TIMEZONE = "UTC"
+
+# Listing pages (/venues, /artists, /shows)
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Most results returned by venue/artist search
+SEARCH_RESULT_LIMIT = 50
+
+# Rows fetched per round trip by /export and flask export
+EXPORT_BATCH_SIZE = 1000
+
+# Shows deleted per transaction when a venue or artist is deleted; 0 deletes
+# them all in one
+DELETE_BATCH_SIZE = 5000
+
+# Cache for the index, listing and detail pages: "memory" (per process),
+# "filesystem" (shared by the workers of a node, in CACHE_DIR) or "redis"
+# (shared by every node, needs the redis package)
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory")
+CACHE_DIR = os.path.join(basedir, ".cache")
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_KEY_PREFIX = "fyyur"
+CACHE_SIZE = 1024
+CACHE_DEFAULT_TTL = 300
+# seconds a cached page may keep splitting past from upcoming shows with an
+# old "now"
+CACHE_NOW_BUCKET = 60
 
+# Templates: compiled bytecode is cached in TEMPLATE_CACHE_DIR (None turns
+# it off). flask compile-templates precompiles them into TEMPLATE_BUNDLE at
+# build time, which is loaded outside debug mode. With TEMPLATE_WARM_UP,
+# create_app loads all of them, so no request waits for a compile.
+TEMPLATE_CACHE_DIR = os.path.join(basedir, ".template-cache")
+TEMPLATE_BUNDLE = os.path.join(basedir, "templates_compiled")
+TEMPLATE_WARM_UP = not DEBUG
+# Static files: flask build-assets writes them to ASSET_BUILD_DIR with
+# content hashed names and precompressed copies, see assets.py. Outside
+# debug mode templates then link to those, served under /assets/ with
+# Cache-Control: immutable for ASSET_MAX_AGE seconds. The images of
+# ASSET_RESPONSIVE_IMAGES are re-encoded ASSET_IMAGE_WIDTHS wide, in each
+# of ASSET_IMAGE_FORMATS, best first. Building needs
+# pip install -r requirements-assets.txt.
+ASSET_BUILD_DIR = os.path.join(basedir, "static_build")
+ASSET_MAX_AGE = 365 * 24 * 3600
+ASSET_RESPONSIVE_IMAGES = ["img/front-splash.jpg"]
+ASSET_IMAGE_WIDTHS = [480, 960, 1440]
+ASSET_IMAGE_FORMATS = ["avif", "webp", "jpeg"]
+# Rendered {% cache %} fragments kept per process, see fragments.py
+FRAGMENT_CACHE_SIZE = 4096
+FRAGMENT_CACHE_TTL = 3600
 
-# TODO IMPLEMENT DATABASE URL
-SQLALCHEMY_DATABASE_URI = "postgresql://kyrayang@localhost:5432/fyyur"
+# Requests running more SQL statements than this are logged as warnings,
+# usually an N+1 query; None turns the check off. See /metrics.
+METRICS_QUERY_BUDGET = 10
+# Also report the peak memory allocated per request. tracemalloc slows
+# every allocation down and its peak is shared by concurrent requests, so
+# only turn it on while investigating.
+METRICS_TRACE_ALLOCATIONS = os.environ.get("METRICS_TRACE_ALLOCATIONS") == "1"
 
-SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+# Serve the venue page, /shows and the searches with the async views of
+# async_views.py, on SQLAlchemy's asyncio engine; needs
+# pip install -r requirements-async.txt. ASYNC_DATABASE_URL defaults to
+# SQLALCHEMY_DATABASE_URI through asyncpg (aiosqlite for SQLite).
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS") == "1"
+ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL")
@@ -0,0 +1,173 @@
+"""The Flask-SQLAlchemy extension, tuned for PostgreSQL.
+
+Pool settings and the statement timeout come from the DATABASE_* settings
+of config.py. DATABASE_PGBOUNCER makes the engines fit a pgbouncer in
+transaction pooling mode, and DATABASE_REPLICA_URL sends the reads of GET
+requests to a replica.
+"""
+import time
+
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy import SQLAlchemy, SignallingSession, get_state
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
+
+REPLICA_BIND = "replica"
+# requests whose reads may go to the replica
+READ_METHODS = ("GET", "HEAD")
+
+
+def engine_options(config, asyncpg=False):
+    """create_engine options for a PostgreSQL database from config."""
+    if config["DATABASE_PGBOUNCER"]:
+        # pgbouncer already pools connections; one kept idle here would
+        # hold a server connection for nothing
+        options = {"poolclass": NullPool}
+        if asyncpg:
+            # no statement caches: prepared statements live on one server
+            # connection, which the next transaction may not get
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+            }
+        return options
+    options = {
+        "pool_size": config["DATABASE_POOL_SIZE"],
+        "max_overflow": config["DATABASE_MAX_OVERFLOW"],
+        "pool_timeout": config["DATABASE_POOL_TIMEOUT"],
+        "pool_recycle": config["DATABASE_POOL_RECYCLE"],
+        "pool_pre_ping": config["DATABASE_POOL_PRE_PING"],
+    }
+    timeout = config["DATABASE_STATEMENT_TIMEOUT"]
+    if timeout:
+        if asyncpg:
+            settings = {"server_settings": {"statement_timeout": str(timeout)}}
+        else:
+            settings = {"options": "-c statement_timeout={}".format(timeout)}
+        options["connect_args"] = settings
+    return options
+
+
+def set_local_statement_timeout(timeout):
+    # pgbouncer rejects startup options, so set it in every transaction
+    def begin(connection):
+        connection.exec_driver_sql(
+            "SET LOCAL statement_timeout = {:d}".format(timeout)
+        )
+
+    return begin
+
+
+def use_replica():
+    """Whether the reads of the current request may go to the replica.
+
+    Only GET and HEAD requests do, and not for DATABASE_REPLICA_STICKY
+    seconds after the same client wrote something, so it reads its own
+    writes even if the replica lags. Decided on the first statement of the
+    request and kept on g for the others.
+    """
+    if not has_request_context():
+        return False
+    if "use_replica" not in g:
+        g.use_replica = (
+            request.method in READ_METHODS
+            and session.get("db_primary_until", 0) < time.time()
+        )
+    return g.use_replica
+
+
+class RoutingSession(SignallingSession):
+    # reads go to the replica bind when use_replica allows, flushes never
+    def get_bind(self, mapper=None, clause=None):
+        app = self.app
+        if (
+            REPLICA_BIND in app.config["SQLALCHEMY_BINDS"]
+            and not self._flushing
+            and use_replica()
+        ):
+            return get_state(app).db.get_engine(app, bind=REPLICA_BIND)
+        return super().get_bind(mapper, clause)
+
+
+class Database(SQLAlchemy):
+    def init_app(self, app):
+        app.config.setdefault("SQLALCHEMY_BINDS", {})
+        replica_url = app.config.get("DATABASE_REPLICA_URL")
+        if replica_url:
+            app.config["SQLALCHEMY_BINDS"] = dict(
+                app.config["SQLALCHEMY_BINDS"], **{REPLICA_BIND: replica_url}
+            )
+        super().init_app(app)
+        app.after_request(self._remember_writes)
+
+    def create_session(self, options):
+        factory = sessionmaker(class_=RoutingSession, db=self, **options)
+
+        @event.listens_for(factory, "after_flush")
+        def after_flush(session, context):
+            if has_request_context():
+                g.db_wrote = True
+
+        @event.listens_for(factory, "do_orm_execute")
+        def do_orm_execute(state):
+            # set-based writes through session.execute, which don't flush
+            if has_request_context() and not state.is_select:
+                g.db_wrote = True
+
+        return factory
+
+    def _remember_writes(self, response):
+        config = current_app.config
+        if g.get("db_wrote") and REPLICA_BIND in config["SQLALCHEMY_BINDS"]:
+            sticky = config["DATABASE_REPLICA_STICKY"]
+            session["db_primary_until"] = time.time() + sticky
+        return response
+
+    def apply_driver_hacks(self, app, sa_url, options):
+        sa_url, options = super().apply_driver_hacks(app, sa_url, options)
+        if sa_url.get_backend_name() == "postgresql":
+            options.update(engine_options(app.config))
+        return sa_url, options
+
+    def create_engine(self, sa_url, engine_opts):
+        engine = super().create_engine(sa_url, engine_opts)
+        app = self.get_app()
+        timeout = app.config["DATABASE_STATEMENT_TIMEOUT"]
+        if (
+            app.config["DATABASE_PGBOUNCER"]
+            and timeout
+            and engine.dialect.name == "postgresql"
+        ):
+            event.listen(engine, "begin", set_local_statement_timeout(timeout))
+        return engine
+
+    def pool_stats(self):
+        """(engine name, pool figures) of the current app's engines.
+
+        Engines without a pool of their own (NullPool, SQLite) are left
+        out.
+        """
+        app = self.get_app()
+        stats = []
+        for bind in [None] + list(app.config["SQLALCHEMY_BINDS"]):
+            pool = self.get_engine(app, bind=bind).pool
+            if isinstance(pool, QueuePool):
+                stats.append((bind or "primary", pool))
+        async_database = app.extensions.get("async_database")
+        if async_database is not None:
+            for name, engine in async_database.engines():
+                if isinstance(engine.pool, QueuePool):
+                    stats.append((name, engine.pool))
+        return [
+            (
+                name,
+                {
+                    "size": pool.size(),
+                    "checked_in": pool.checkedin(),
+                    "checked_out": pool.checkedout(),
+                    "overflow": max(pool.overflow(), 0),
+                },
+            )
+            for name, pool in stats
+        ]
@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from flask import current_app
+from sqlalchemy import and_
+from sqlalchemy.orm import selectinload
+
+from importer import LIST_SEPARATOR
+from models import Artist, Show, Venue, db
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/jsonl",
+    "ndjson": "application/x-ndjson",
+}
+EXPORT_MODELS = {"venues": Venue, "artists": Artist, "shows": Show}
+
+
+def to_plain(value):
+    if isinstance(value, datetime):
+        # the format ShowForm reads back
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def csv_lines(rows, columns):
+    # one small buffer reused for every line, so memory stays flat
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writerow(columns)
+    yield flush()
+    for row in rows:
+        values = []
+        for column in columns:
+            value = to_plain(row[column])
+            if isinstance(value, list):
+                # the same shape flask import reads back
+                value = LIST_SEPARATOR.join(value)
+            values.append(value)
+        writer.writerow(values)
+        yield flush()
+
+
+def json_lines(rows, columns):
+    for row in rows:
+        record = {column: to_plain(row[column]) for column in columns}
+        yield json.dumps(record) + "\n"
+
+
+def export_lines(rows, columns, format):
+    """Render dict rows as lines of a CSV or JSON lines file, lazily.
+
+    Lists (genres) become semicolon separated cells in CSV, and dates ISO
+    8601 strings ("2026-07-16 22:00:00"), so an export can be fed back to
+    flask import.
+    """
+    if format == "csv":
+        return csv_lines(rows, columns)
+    if format in ("jsonl", "ndjson"):
+        return json_lines(rows, columns)
+    raise ValueError("Unknown export format {!r}".format(format))
+
+
+def export_columns(model):
+    columns = [
+        column.key
+        for column in model.__table__.columns
+        if column.key != "search_vector"
+    ]
+    if hasattr(model, "genres"):
+        columns.append("genres")
+    return columns
+
+
+def export_rows(model, state=None, start=None, end=None, updated_since=None):
+    """Yield the rows of Venue, Artist or Show as dicts, in id order.
+
+    Rows are fetched EXPORT_BATCH_SIZE at a time through a server-side
+    cursor, so the export never holds the whole table. state is the state
+    of the venue or artist (of the venue for shows); start and end bound
+    show start times, or for venues and artists select those with a show
+    in that range; updated_since allows incremental pulls.
+    """
+    show_filters = []
+    if start:
+        show_filters.append(Show.start_time >= start)
+    if end:
+        show_filters.append(Show.start_time < end)
+    if model is Show:
+        query = db.session.query(*Show.__table__.columns).filter(
+            *show_filters
+        )
+        if state:
+            query = query.join(Venue, Show.venue_id == Venue.id).filter(
+                Venue.state == state
+            )
+    else:
+        # genres come with one IN query per batch
+        query = model.query.options(selectinload(model.genres))
+        if state:
+            query = query.filter(model.state == state)
+        if show_filters:
+            shows = model.children if model is Venue else model.parents
+            query = query.filter(shows.any(and_(*show_filters)))
+    if updated_since:
+        query = query.filter(model.updated_at >= updated_since)
+    columns = export_columns(model)
+    batch_size = current_app.config["EXPORT_BATCH_SIZE"]
+    for row in query.order_by(model.id).yield_per(batch_size):
+        values = {column: getattr(row, column) for column in columns}
+        if "genres" in values:
+            values["genres"] = row.genre_names
+        yield values
@@ -13,6 +13,11 @@ def test():
         abort("Aborted at user request.")
 
 
+def bench(output="bench.json"):
+    # route timings on the synthetic dataset, see benchmarks/compare.py
+    local("python benchmarks/bench_routes.py --output {}".format(output))
+
+
 def commit():
     message = raw_input("Enter a git commit message: ")
     local("git add . && git commit -am '{}'".format(message))
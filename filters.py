@@ -0,0 +1,74 @@
+from datetime import datetime
+from functools import lru_cache
+
+from flask import current_app, g, request
+
+# babel and dateutil are imported where used: they take a while to load and
+# neither is needed until a page is rendered
+
+DATETIME_FORMATS = {
+    "full": "EEE MM, d, y 'at' h:mma",
+    "medium": "EE MM, dd, y h:mma",
+}
+
+
+@lru_cache(maxsize=256)
+def datetime_pattern(format, locale):
+    # parsing the pattern and loading the locale data are the costly parts
+    # of babel's format_datetime, and a page only uses a handful of them
+    import babel
+    import babel.dates
+
+    return babel.dates.parse_pattern(format), babel.Locale.parse(locale)
+
+
+@lru_cache(maxsize=64)
+def get_timezone(name):
+    import babel.dates
+
+    return babel.dates.get_timezone(name)
+
+
+def localize(value, timezone):
+    # pytz zones (older babel) need localize(), zoneinfo ones replace()
+    if hasattr(timezone, "localize"):
+        return timezone.localize(value)
+    return value.replace(tzinfo=timezone)
+
+
+def format_datetime(value, format="medium"):
+    if not isinstance(value, datetime):
+        import dateutil.parser
+
+        value = dateutil.parser.parse(value)
+    locale = g.get("locale", current_app.config["DEFAULT_LOCALE"])
+    if format in ("short", "long"):
+        # babel's named formats, not patterns
+        import babel.dates
+
+        return babel.dates.format_datetime(value, format, locale=locale)
+    pattern, locale = datetime_pattern(
+        DATETIME_FORMATS.get(format, format), locale
+    )
+    timezone = g.get("timezone")
+    if timezone is not None:
+        if value.tzinfo is None:
+            stored = get_timezone(current_app.config["STORED_TIMEZONE"])
+            value = localize(value, stored)
+        value = value.astimezone(timezone)
+    return pattern.apply(value, locale)
+
+
+def select_locale():
+    # before every request, see create_app
+    config = current_app.config
+    g.locale = (
+        request.accept_languages.best_match(config["SUPPORTED_LOCALES"])
+        or config["DEFAULT_LOCALE"]
+    )
+    timezone = request.cookies.get("timezone")
+    if timezone:
+        try:
+            g.timezone = get_timezone(timezone)
+        except LookupError:
+            pass
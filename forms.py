@@ -1,6 +1,7 @@
 from datetime import datetime
 from flask_wtf import Form
 from wtforms import (
+    IntegerField,
     StringField,
     SelectField,
     SelectMultipleField,
@@ -12,8 +13,8 @@ from wtforms.fields.html5 import DateTimeLocalField
 
 
 class ShowForm(Form):
-    artist_id = StringField("artist_id", validators=[DataRequired()])
-    venue_id = StringField("venue_id", validators=[DataRequired()])
+    artist_id = IntegerField("artist_id", validators=[DataRequired()])
+    venue_id = IntegerField("venue_id", validators=[DataRequired()])
     start_time = DateTimeLocalField(
         "start_time",
         validators=[DataRequired()],
@@ -0,0 +1,107 @@
+"""The {% cache %} template tag: fragments rendered once per key.
+
+    {% cache ["show", show.id, show.updated_at], 600 %}
+        ...
+    {% endcache %}
+
+renders its body the first time, then serves the HTML from a bounded
+in-memory LRU store (FRAGMENT_CACHE_SIZE entries per process) until the
+ttl, FRAGMENT_CACHE_TTL seconds by default, runs out. Nothing is ever
+invalidated: keys hold the ids and updated_at of what the fragment shows,
+so a change makes a new key and the old entry ages out. The template name
+and the locale and time zone of the request are part of every key.
+"""
+import hashlib
+import threading
+from collections import Counter
+
+from flask import g, has_app_context
+from jinja2 import nodes
+from jinja2.ext import Extension
+from jinja2.utils import is_undefined
+
+from cache import LRUCache
+
+
+class FragmentCacheExtension(Extension):
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [nodes.Const(parser.name), parser.parse_expression()]
+        if parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        else:
+            args.append(nodes.Const(None))
+        body = parser.parse_statements(["name:endcache"], drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("_render", args), [], [], body
+        ).set_lineno(lineno)
+
+    def _render(self, template, key, ttl, caller):
+        fragments = self.environment.fragment_cache
+        if fragments is None:
+            return caller()
+        return fragments.render(template, key, ttl, caller)
+
+
+class FragmentCache(object):
+    """The store behind {% cache %}, with hit and miss counts per template."""
+
+    def __init__(self, app=None):
+        self.store = None
+        self._lock = threading.Lock()
+        self._results = Counter()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.store = LRUCache(
+            app.config["FRAGMENT_CACHE_SIZE"], app.config["FRAGMENT_CACHE_TTL"]
+        )
+        app.jinja_env.add_extension(FragmentCacheExtension)
+        app.jinja_env.fragment_cache = self
+
+    def _key(self, template, key):
+        locale = timezone = None
+        if has_app_context():
+            locale = g.get("locale")
+            timezone = g.get("timezone")
+        parts = repr((key, locale, timezone and str(timezone)))
+        return "{}:{}".format(
+            template, hashlib.sha1(parts.encode("utf-8")).hexdigest()
+        )
+
+    def render(self, template, key, ttl, caller):
+        parts = key if isinstance(key, (list, tuple)) else [key]
+        if any(is_undefined(part) for part in parts):
+            # e.g. a page cached before its data had the key's fields;
+            # every such fragment would share one key
+            return caller()
+        cache_key = self._key(template, key)
+        html = self.store.get(cache_key)
+        with self._lock:
+            self._results[template, html is not None] += 1
+        if html is None:
+            html = caller()
+            self.store.set(cache_key, html, ttl)
+        return html
+
+    def results(self):
+        """((template, hit), count) pairs, hit being True or False."""
+        with self._lock:
+            return sorted(self._results.items())
+
+    def stats(self):
+        templates = {}
+        for (template, hit), count in self.results():
+            counts = templates.setdefault(template, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] = count
+        return dict(self.store.stats(), templates=templates)
+
+
+fragments = FragmentCache()
@@ -0,0 +1,110 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from werkzeug.datastructures import MultiDict
+
+# CSV cells holding several values separate them with this
+LIST_SEPARATOR = ";"
+LIST_FIELDS = ("genres",)
+BOOLEAN_FIELDS = ("seeking_talent", "seeking_venue")
+TRUE_VALUES = ("1", "true", "yes", "y")
+
+
+def read_records(path):
+    """Yield the rows of a CSV or JSON lines file one dict at a time."""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8") as records_file:
+        if extension == ".csv":
+            for record in csv.DictReader(records_file):
+                yield record
+        elif extension in (".jsonl", ".ndjson"):
+            for line in records_file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise ValueError(
+                "Expected a .csv, .jsonl or .ndjson file, got " + path
+            )
+
+
+def to_formdata(record):
+    # the shape a form POST would have: repeated keys for lists, booleans
+    # present only when checked
+    formdata = MultiDict()
+    for key, value in record.items():
+        if key in LIST_FIELDS:
+            if isinstance(value, str):
+                value = [v.strip() for v in value.split(LIST_SEPARATOR)]
+            formdata.setlist(key, [v for v in value if v])
+        elif key in BOOLEAN_FIELDS:
+            if isinstance(value, str):
+                value = value.strip().lower() in TRUE_VALUES
+            if value:
+                formdata[key] = "y"
+        elif value is not None:
+            formdata[key] = str(value)
+    return formdata
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_records(
+    session,
+    records,
+    form_class,
+    build,
+    insert=None,
+    batch_size=1000,
+    report=print,
+):
+    """Validate records with form_class and insert them batch by batch.
+
+    build turns a validated form into what insert (default: add_all, for
+    model instances) writes to the session. Each batch is committed on its
+    own: invalid rows are reported and skipped, and a batch the database
+    rejects is reported and rolled back without stopping the import.
+    Returns the numbers of rows imported, invalid and lost with failed
+    batches.
+    """
+    insert = insert or (lambda session, items: session.add_all(items))
+    # one form refilled per row; building the fields is most of its cost
+    form = form_class(meta={"csrf": False})
+    imported = invalid = failed = 0
+    numbered = enumerate(records, start=1)
+    for batch_number, batch in enumerate(batched(numbered, batch_size), 1):
+        items = []
+        for row_number, record in batch:
+            form.process(to_formdata(record))
+            if not form.validate():
+                invalid += 1
+                report("row {}: {}".format(row_number, form.errors))
+                continue
+            items.append(build(form))
+        if not items:
+            continue
+        try:
+            insert(session, items)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            failed += len(items)
+            report(
+                "batch {} (rows {}-{}) failed: {}".format(
+                    batch_number,
+                    batch[0][0],
+                    batch[-1][0],
+                    str(e).splitlines()[0],
+                )
+            )
+        else:
+            imported += len(items)
+    return imported, invalid, failed
@@ -0,0 +1,180 @@
+from datetime import datetime
+
+from flask import (
+    Blueprint,
+    Response,
+    abort,
+    current_app,
+    jsonify,
+    render_template,
+    request,
+    stream_with_context,
+)
+from sqlalchemy import desc
+
+from exporter import (
+    EXPORT_FORMATS,
+    EXPORT_MODELS,
+    export_columns,
+    export_lines,
+    export_rows,
+)
+from fragments import fragments
+from models import Artist, Venue, VenueShowCount
+from pages import (
+    abort_if_not_modified,
+    cache,
+    listing_cache_key,
+    listing_validators,
+)
+from search import full_text_search
+
+# the home page, site-wide search, exports and error pages
+bp = Blueprint("main", __name__)
+
+
+@bp.route("/")
+def index():
+    now = datetime.today()
+    abort_if_not_modified(*listing_validators(now))
+    cache_key = listing_cache_key(now)
+    cached = cache.get(cache_key)
+    if cached is None:
+        recent_artists = [
+            {
+                "id": artist.id,
+                "name": artist.name,
+                "image_link": artist.image_link,
+            }
+            for artist in Artist.query.with_entities(
+                Artist.id, Artist.name, Artist.image_link
+            )
+            .order_by(desc(Artist.id))
+            .limit(10)
+        ]
+        recent_venues = [
+            {
+                "id": venue.id,
+                "name": venue.name,
+                "image_link": venue.image_link,
+            }
+            for venue in Venue.query.with_entities(
+                Venue.id, Venue.name, Venue.image_link
+            )
+            .order_by(desc(Venue.id))
+            .limit(10)
+        ]
+        active_venues = [
+            {
+                "id": venue.id,
+                "name": venue.name,
+                "image_link": venue.image_link,
+                "num_upcoming_shows": venue.upcoming_shows,
+            }
+            for venue in Venue.query.join(
+                VenueShowCount, VenueShowCount.venue_id == Venue.id
+            )
+            .with_entities(
+                Venue.id,
+                Venue.name,
+                Venue.image_link,
+                VenueShowCount.upcoming_shows,
+            )
+            .filter(VenueShowCount.upcoming_shows > 0)
+            .order_by(desc(VenueShowCount.upcoming_shows), Venue.id)
+            .limit(10)
+        ]
+        cached = (recent_artists, recent_venues, active_venues)
+        cache.set(cache_key, cached)
+    recent_artists, recent_venues, active_venues = cached
+    return render_template(
+        "pages/home.html",
+        artists=recent_artists,
+        venues=recent_venues,
+        active_venues=active_venues,
+    )
+
+
+@bp.route("/search")
+def search():
+    # JSON search over venues and/or artists: /search?q=hop&type=venues
+    search_term = request.args.get("q", "").strip()
+    if not search_term:
+        abort(400)
+    limit = request.args.get(
+        "limit", current_app.config["SEARCH_RESULT_LIMIT"], type=int
+    )
+    limit = max(1, min(limit, current_app.config["SEARCH_RESULT_LIMIT"]))
+    models = {"venues": Venue, "artists": Artist}
+    search_type = request.args.get("type")
+    if search_type is not None:
+        if search_type not in models:
+            abort(400)
+        models = {search_type: models[search_type]}
+    response = {"search_term": search_term}
+    for key, model in models.items():
+        res = full_text_search(model, search_term, limit)
+        response[key] = {
+            "count": len(res),
+            "data": [{"id": r.id, "name": r.name} for r in res],
+        }
+    return jsonify(response)
+
+
+@bp.route("/cache/stats")
+def cache_stats():
+    return jsonify(dict(cache.stats(), fragments=fragments.stats()))
+
+
+#  Export
+#  ----------------------------------------------------------------
+
+
+def export_date_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        abort(400)
+
+
+@bp.route(
+    "/export/<any(venues, artists, shows):kind>.<any(csv, jsonl, ndjson):format>"
+)
+def export(kind, format):
+    # e.g. /export/shows.csv?state=CA&from=2026-01-01&updated_since=...
+    model = EXPORT_MODELS[kind]
+    rows = export_rows(
+        model,
+        state=request.args.get("state"),
+        start=export_date_arg("from"),
+        end=export_date_arg("to"),
+        updated_since=export_date_arg("updated_since"),
+    )
+    # the generator runs after this returns, while the response is sent
+    lines = export_lines(rows, export_columns(model), format)
+    response = Response(
+        stream_with_context(lines), mimetype=EXPORT_FORMATS[format]
+    )
+    response.headers.set(
+        "Content-Disposition",
+        "attachment",
+        filename="{}.{}".format(kind, format),
+    )
+    return response
+
+
+#  Errors
+#  ----------------------------------------------------------------
+
+
+@bp.app_errorhandler(404)
+def not_found_error(error):
+    return render_template("errors/404.html"), 404
+
+
+@bp.app_errorhandler(500)
+def server_error(error):
+    return render_template("errors/500.html"), 500
@@ -0,0 +1,271 @@
+import threading
+import time
+import tracemalloc
+
+from flask import (
+    Response,
+    before_render_template,
+    current_app,
+    g,
+    has_app_context,
+    request,
+    template_rendered,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# upper bounds, in seconds, of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class EndpointStats(object):
+    def __init__(self):
+        self.requests = 0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.duration = 0.0
+        self.queries = 0
+        self.max_queries = 0
+        self.sql_duration = 0.0
+        self.render_duration = 0.0
+        self.peak_allocated = 0
+        self.over_budget = 0
+
+
+class RequestMetrics(object):
+    """Per-endpoint request timings and SQL query counts for Prometheus.
+
+    Records the wall time of every request, the number and total time of
+    its SQL statements, the time spent rendering templates and, with
+    METRICS_TRACE_ALLOCATIONS, the peak of memory allocated meanwhile, and
+    serves them at /metrics in the Prometheus text format. Requests running
+    more than METRICS_QUERY_BUDGET statements are logged as warnings. The
+    figures are kept per process. Statements of the async views count too:
+    they run in a copy of the request's context (see asyncdb).
+    """
+
+    def __init__(self, app=None, prefix="fyyur"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._collected = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("METRICS_QUERY_BUDGET", None)
+        app.config.setdefault("METRICS_TRACE_ALLOCATIONS", False)
+        self.trace_allocations = app.config["METRICS_TRACE_ALLOCATIONS"]
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        app.before_request(self._start_request)
+        app.teardown_request(self._end_request)
+        # process-wide listeners, registered once however many apps
+        if not event.contains(
+            Engine, "before_cursor_execute", self._start_query
+        ):
+            event.listen(Engine, "before_cursor_execute", self._start_query)
+            event.listen(Engine, "after_cursor_execute", self._end_query)
+        before_render_template.connect(self._start_render, app)
+        template_rendered.connect(self._end_render, app)
+        app.add_url_rule("/metrics", "metrics", self.metrics_view)
+
+    def add_gauge(self, name, help, collect):
+        """Also serve the gauge name at /metrics.
+
+        collect is called in the app context of the /metrics request and
+        returns (labels, value) pairs, labels being (name, value) pairs.
+        """
+        self._collected.append((name, "gauge", help, collect))
+
+    def add_counter(self, name, help, collect):
+        """Also serve the counter name at /metrics, see add_gauge."""
+        self._collected.append((name, "counter", help, collect))
+
+    def _current(self):
+        # the figures of the request being served, None outside of one
+        if has_app_context():
+            return g.get("_request_metrics")
+        return None
+
+    def _start_request(self):
+        allocated = 0
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            allocated = tracemalloc.get_traced_memory()[0]
+        g._request_metrics = {
+            "started": time.perf_counter(),
+            "allocated": allocated,
+            "queries": 0,
+            "sql_duration": 0.0,
+            "render_started": None,
+            "render_duration": 0.0,
+        }
+
+    def _start_query(self, conn, cursor, statement, parameters, *args):
+        current = self._current()
+        if current is not None:
+            conn.info.setdefault("query_started", []).append(
+                time.perf_counter()
+            )
+
+    def _end_query(self, conn, cursor, statement, parameters, *args):
+        current = self._current()
+        started = conn.info.get("query_started")
+        if current is not None and started:
+            current["queries"] += 1
+            current["sql_duration"] += time.perf_counter() - started.pop()
+
+    def _start_render(self, sender, template, context, **extra):
+        current = self._current()
+        if current is not None:
+            current["render_started"] = time.perf_counter()
+
+    def _end_render(self, sender, template, context, **extra):
+        current = self._current()
+        if current is not None and current["render_started"] is not None:
+            current["render_duration"] += (
+                time.perf_counter() - current["render_started"]
+            )
+            current["render_started"] = None
+
+    def _end_request(self, exc=None):
+        current = g.pop("_request_metrics", None)
+        if current is None:
+            return
+        duration = time.perf_counter() - current["started"]
+        endpoint = request.endpoint or "unmatched"
+        peak = 0
+        if self.trace_allocations:
+            # above what was allocated when the request came in
+            peak = tracemalloc.get_traced_memory()[1] - current["allocated"]
+        query_budget = current_app.config["METRICS_QUERY_BUDGET"]
+        over_budget = (
+            query_budget is not None and current["queries"] > query_budget
+        )
+        if over_budget:
+            current_app.logger.warning(
+                "%s %s ran %d SQL queries, over the budget of %d",
+                request.method,
+                request.full_path,
+                current["queries"],
+                query_budget,
+            )
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, EndpointStats())
+            stats.requests += 1
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    stats.buckets[i] += 1
+            stats.duration += duration
+            stats.queries += current["queries"]
+            stats.max_queries = max(stats.max_queries, current["queries"])
+            stats.sql_duration += current["sql_duration"]
+            stats.render_duration += current["render_duration"]
+            stats.peak_allocated = max(stats.peak_allocated, peak)
+            stats.over_budget += over_budget
+
+    def render(self):
+        """The collected figures in the Prometheus text exposition format."""
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            lines = []
+
+            def metric(name, type, help, samples):
+                name = "{}_{}".format(self.prefix, name)
+                lines.append("# HELP {} {}".format(name, help))
+                lines.append("# TYPE {} {}".format(name, type))
+                for suffix, labels, value in samples:
+                    label_text = ",".join(
+                        '{}="{}"'.format(key, value) for key, value in labels
+                    )
+                    lines.append(
+                        "{}{}{{{}}} {}".format(name, suffix, label_text, value)
+                    )
+
+            duration_samples = []
+            for endpoint, stats in endpoints:
+                for bound, count in zip(DURATION_BUCKETS, stats.buckets):
+                    duration_samples.append(
+                        (
+                            "_bucket",
+                            (("endpoint", endpoint), ("le", bound)),
+                            count,
+                        )
+                    )
+                labels = (("endpoint", endpoint),)
+                duration_samples.append(
+                    ("_bucket", labels + (("le", "+Inf"),), stats.requests)
+                )
+                duration_samples.append(("_sum", labels, stats.duration))
+                duration_samples.append(("_count", labels, stats.requests))
+            metric(
+                "request_duration_seconds",
+                "histogram",
+                "Wall time of requests.",
+                duration_samples,
+            )
+            for name, type, help, attribute in (
+                (
+                    "sql_queries_total",
+                    "counter",
+                    "SQL statements run by requests.",
+                    "queries",
+                ),
+                (
+                    "sql_queries_per_request_max",
+                    "gauge",
+                    "Most SQL statements run by one request.",
+                    "max_queries",
+                ),
+                (
+                    "sql_duration_seconds_total",
+                    "counter",
+                    "Time spent running SQL statements.",
+                    "sql_duration",
+                ),
+                (
+                    "template_render_seconds_total",
+                    "counter",
+                    "Time spent rendering templates.",
+                    "render_duration",
+                ),
+                (
+                    "request_peak_allocated_bytes",
+                    "gauge",
+                    "Highest peak of memory allocated during a request.",
+                    "peak_allocated",
+                ),
+                (
+                    "query_budget_exceeded_total",
+                    "counter",
+                    "Requests running more SQL statements than the budget.",
+                    "over_budget",
+                ),
+            ):
+                metric(
+                    name,
+                    type,
+                    help,
+                    [
+                        (
+                            "",
+                            (("endpoint", endpoint),),
+                            getattr(stats, attribute),
+                        )
+                        for endpoint, stats in endpoints
+                    ],
+                )
+        for name, type, help, collect in self._collected:
+            metric(
+                name,
+                type,
+                help,
+                [("", labels, value) for labels, value in collect()],
+            )
+        return "\n".join(lines) + "\n"
+
+    def metrics_view(self):
+        return Response(
+            self.render(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
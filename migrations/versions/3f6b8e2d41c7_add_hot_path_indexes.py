@@ -0,0 +1,43 @@
+"""add hot path indexes
+
+Revision ID: 3f6b8e2d41c7
+Revises: ca3243edb734
+Create Date: 2026-10-18 10:12:31.418062
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6b8e2d41c7'
+down_revision = 'ca3243edb734'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # trigram operators back the GIN indexes used by name search
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_show_start_time', 'show', ['start_time'], unique=False)
+    op.create_index('ix_show_venue_id_start_time', 'show', ['venue_id', 'start_time'], unique=False)
+    op.create_index('ix_show_artist_id_start_time', 'show', ['artist_id', 'start_time'], unique=False)
+    op.create_index('ix_venue_state_city', 'venue', ['state', 'city'], unique=False)
+    op.create_index('ix_venue_name_trgm', 'venue', ['name'], unique=False,
+                    postgresql_using='gin',
+                    postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_artist_name', 'artist', ['name'], unique=False)
+    op.create_index('ix_artist_state_city', 'artist', ['state', 'city'], unique=False)
+    op.create_index('ix_artist_name_trgm', 'artist', ['name'], unique=False,
+                    postgresql_using='gin',
+                    postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_artist_name_trgm', table_name='artist')
+    op.drop_index('ix_artist_state_city', table_name='artist')
+    op.drop_index('ix_artist_name', table_name='artist')
+    op.drop_index('ix_venue_name_trgm', table_name='venue')
+    op.drop_index('ix_venue_state_city', table_name='venue')
+    op.drop_index('ix_show_artist_id_start_time', table_name='show')
+    op.drop_index('ix_show_venue_id_start_time', table_name='show')
+    op.drop_index('ix_show_start_time', table_name='show')
@@ -0,0 +1,56 @@
+"""add search vectors
+
+Revision ID: 8d1c5a7e9b24
+Revises: 3f6b8e2d41c7
+Create Date: 2026-10-18 11:40:05.273914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8d1c5a7e9b24'
+down_revision = '3f6b8e2d41c7'
+branch_labels = None
+depends_on = None
+
+
+# name weighs most, then where and what is played, then the description
+SEARCH_VECTOR = """
+    setweight(to_tsvector('simple', coalesce({row}name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce({row}city, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce({row}genres, '')), 'B') ||
+    setweight(to_tsvector('english',
+                          coalesce({row}seeking_description, '')), 'C')
+"""
+
+
+def upgrade():
+    for table in ('venue', 'artist'):
+        op.add_column(table, sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+        op.execute("""
+            CREATE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {vector};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """.format(table=table, vector=SEARCH_VECTOR.format(row='NEW.')))
+        op.execute("""
+            CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE ON {table}
+            FOR EACH ROW EXECUTE PROCEDURE {table}_search_vector_update()
+        """.format(table=table))
+        op.execute('UPDATE {table} SET search_vector = {vector}'.format(
+            table=table, vector=SEARCH_VECTOR.format(row='')))
+        op.create_index('ix_{}_search_vector'.format(table), table, ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    for table in ('artist', 'venue'):
+        op.drop_index('ix_{}_search_vector'.format(table), table_name=table)
+        op.execute('DROP TRIGGER {table}_search_vector_trigger ON {table}'.format(table=table))
+        op.execute('DROP FUNCTION {}_search_vector_update()'.format(table))
+        op.drop_column(table, 'search_vector')
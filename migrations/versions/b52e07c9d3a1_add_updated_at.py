@@ -0,0 +1,29 @@
+"""add updated_at
+
+Revision ID: b52e07c9d3a1
+Revises: 8d1c5a7e9b24
+Create Date: 2026-10-18 13:05:52.806417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b52e07c9d3a1'
+down_revision = '8d1c5a7e9b24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # existing rows start out as modified now; the app keeps it current
+    for table in ('venue', 'artist', 'show'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=False,
+                                       server_default=sa.text("(now() at time zone 'utc')")))
+        op.alter_column(table, 'updated_at', server_default=None)
+
+
+def downgrade():
+    for table in ('show', 'artist', 'venue'):
+        op.drop_column(table, 'updated_at')
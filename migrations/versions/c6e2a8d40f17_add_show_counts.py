@@ -0,0 +1,48 @@
+"""add show counts
+
+Revision ID: c6e2a8d40f17
+Revises: f19d3b6a7c02
+Create Date: 2026-10-18 16:20:41.118305
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6e2a8d40f17'
+down_revision = 'f19d3b6a7c02'
+branch_labels = None
+depends_on = None
+
+
+# start times are stored naive, like LOCALTIMESTAMP
+SHOW_COUNTS = """
+    CREATE MATERIALIZED VIEW {entity}_show_counts AS
+    SELECT {entity}_id,
+           count(*) FILTER (WHERE start_time > LOCALTIMESTAMP)
+               AS upcoming_shows,
+           count(*) FILTER (WHERE start_time <= LOCALTIMESTAMP)
+               AS past_shows,
+           LOCALTIMESTAMP AS refreshed_at
+    FROM show
+    GROUP BY {entity}_id
+"""
+
+
+def upgrade():
+    for entity in ('venue', 'artist'):
+        op.execute(SHOW_COUNTS.format(entity=entity))
+        # the unique index is what allows REFRESH ... CONCURRENTLY
+        op.execute(
+            'CREATE UNIQUE INDEX ix_{entity}_show_counts_{entity}_id '
+            'ON {entity}_show_counts ({entity}_id)'.format(entity=entity)
+        )
+        op.execute(
+            'CREATE INDEX ix_{entity}_show_counts_upcoming_shows '
+            'ON {entity}_show_counts (upcoming_shows)'.format(entity=entity)
+        )
+
+
+def downgrade():
+    op.execute('DROP MATERIALIZED VIEW artist_show_counts')
+    op.execute('DROP MATERIALIZED VIEW venue_show_counts')
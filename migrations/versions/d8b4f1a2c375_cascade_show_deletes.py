@@ -0,0 +1,43 @@
+"""cascade show deletes
+
+Revision ID: d8b4f1a2c375
+Revises: c6e2a8d40f17
+Create Date: 2026-10-18 17:05:12.472918
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8b4f1a2c375'
+down_revision = 'c6e2a8d40f17'
+branch_labels = None
+depends_on = None
+
+
+# (table, column, referenced table) of the foreign keys deleting a venue or
+# an artist cascades through; all were created unnamed, so they have
+# PostgreSQL's default {table}_{column}_fkey names
+FOREIGN_KEYS = [
+    ('show', 'venue_id', 'venue'),
+    ('show', 'artist_id', 'artist'),
+    ('venue_genre', 'venue_id', 'venue'),
+    ('artist_genre', 'artist_id', 'artist'),
+]
+
+
+def recreate_foreign_keys(ondelete):
+    for table, column, referred in FOREIGN_KEYS:
+        name = '{}_{}_fkey'.format(table, column)
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(
+            name, table, referred, [column], ['id'], ondelete=ondelete
+        )
+
+
+def upgrade():
+    recreate_foreign_keys('CASCADE')
+
+
+def downgrade():
+    recreate_foreign_keys(None)
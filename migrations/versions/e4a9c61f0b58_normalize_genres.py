@@ -0,0 +1,129 @@
+"""normalize genres
+
+Revision ID: e4a9c61f0b58
+Revises: b52e07c9d3a1
+Create Date: 2026-10-18 14:21:37.150244
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a9c61f0b58'
+down_revision = 'b52e07c9d3a1'
+branch_labels = None
+depends_on = None
+
+
+# same weights as add_search_vectors, with genres read from the new tables
+SEARCH_VECTOR = """
+    setweight(to_tsvector('simple', coalesce({row}name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce({row}city, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce((
+        SELECT string_agg(genre.name, ' ') FROM {table}_genre
+        JOIN genre ON genre.id = {table}_genre.genre_id
+        WHERE {table}_genre.{table}_id = {row}id), '')), 'B') ||
+    setweight(to_tsvector('english',
+                          coalesce({row}seeking_description, '')), 'C')
+"""
+
+OLD_SEARCH_VECTOR = """
+    setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(NEW.city, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(NEW.genres, '')), 'B') ||
+    setweight(to_tsvector('english',
+                          coalesce(NEW.seeking_description, '')), 'C')
+"""
+
+
+def replace_search_function(table, vector):
+    op.execute("""
+        CREATE OR REPLACE FUNCTION {table}_search_vector_update()
+        RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {vector};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """.format(table=table, vector=vector))
+
+
+def upgrade():
+    op.create_table('genre',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    for table in ('venue', 'artist'):
+        op.create_table('{}_genre'.format(table),
+        sa.Column('{}_id'.format(table), sa.Integer(), nullable=False),
+        sa.Column('genre_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['genre_id'], ['genre.id'], ),
+        sa.ForeignKeyConstraint(['{}_id'.format(table)], ['{}.id'.format(table)], ),
+        sa.PrimaryKeyConstraint('{}_id'.format(table), 'genre_id')
+        )
+        op.create_index(op.f('ix_{}_genre_genre_id'.format(table)), '{}_genre'.format(table), ['genre_id'], unique=False)
+
+    # genres were stored as the text of a postgres array, e.g.
+    # {Jazz,"Rock n Roll"}, so casting back to text[] parses them
+    op.execute("""
+        INSERT INTO genre (name)
+        SELECT DISTINCT unnest(genres::text[]) FROM venue
+        UNION
+        SELECT DISTINCT unnest(genres::text[]) FROM artist
+    """)
+    for table in ('venue', 'artist'):
+        op.execute("""
+            INSERT INTO {table}_genre ({table}_id, genre_id)
+            SELECT DISTINCT {table}.id, genre.id
+            FROM {table}
+            CROSS JOIN LATERAL unnest({table}.genres::text[]) AS g(name)
+            JOIN genre ON genre.name = g.name
+        """.format(table=table))
+        replace_search_function(table, SEARCH_VECTOR.format(table=table, row='NEW.'))
+        # keep the vector current when only the genres of a row change
+        op.execute("""
+            CREATE FUNCTION {table}_genre_search_vector_update()
+            RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    UPDATE {table} SET search_vector = NULL
+                    WHERE id = OLD.{table}_id;
+                ELSE
+                    UPDATE {table} SET search_vector = NULL
+                    WHERE id = NEW.{table}_id;
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """.format(table=table))
+        op.execute("""
+            CREATE TRIGGER {table}_genre_search_vector_trigger
+            AFTER INSERT OR DELETE ON {table}_genre
+            FOR EACH ROW EXECUTE PROCEDURE {table}_genre_search_vector_update()
+        """.format(table=table))
+        op.drop_column(table, 'genres')
+        # the venue/artist trigger recomputes the vector on update
+        op.execute('UPDATE {} SET search_vector = NULL'.format(table))
+
+
+def downgrade():
+    for table in ('artist', 'venue'):
+        op.add_column(table, sa.Column('genres', sa.VARCHAR(length=120), nullable=True))
+        op.execute("""
+            UPDATE {table} SET genres = coalesce((
+                SELECT array_agg(genre.name ORDER BY genre.name)
+                FROM {table}_genre
+                JOIN genre ON genre.id = {table}_genre.genre_id
+                WHERE {table}_genre.{table}_id = {table}.id), '{{}}')::text
+        """.format(table=table))
+        op.alter_column(table, 'genres', nullable=False)
+        op.execute('DROP TRIGGER {table}_genre_search_vector_trigger ON {table}_genre'.format(table=table))
+        op.execute('DROP FUNCTION {}_genre_search_vector_update()'.format(table))
+        replace_search_function(table, OLD_SEARCH_VECTOR)
+        op.drop_index(op.f('ix_{}_genre_genre_id'.format(table)), table_name='{}_genre'.format(table))
+        op.drop_table('{}_genre'.format(table))
+        op.execute('UPDATE {} SET search_vector = NULL'.format(table))
+    op.drop_table('genre')
@@ -0,0 +1,39 @@
+"""show slot exclusion
+
+Revision ID: f19d3b6a7c02
+Revises: e4a9c61f0b58
+Create Date: 2026-10-18 15:48:09.604338
+
+"""
+from alembic import op
+
+from models import SHOW_SLOT_HOURS
+
+
+# revision identifiers, used by Alembic.
+revision = 'f19d3b6a7c02'
+down_revision = 'e4a9c61f0b58'
+branch_labels = None
+depends_on = None
+
+
+SLOT = "interval '{} hours'".format(SHOW_SLOT_HOURS)
+
+
+def upgrade():
+    # gist over a plain integer column needs btree_gist; fails if overlapping
+    # shows already exist, which then have to be rescheduled first
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    for column in ('artist_id', 'venue_id'):
+        op.execute("""
+            ALTER TABLE show ADD CONSTRAINT show_{name}_slot_excl
+            EXCLUDE USING gist (
+                {column} WITH =,
+                tsrange(start_time, start_time + {slot}) WITH &&
+            )
+        """.format(name=column[:-3], column=column, slot=SLOT))
+
+
+def downgrade():
+    op.drop_constraint('show_venue_slot_excl', 'show')
+    op.drop_constraint('show_artist_slot_excl', 'show')
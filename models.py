@@ -0,0 +1,338 @@
+from datetime import datetime
+
+from flask.signals import Namespace
+from sqlalchemy import func, literal, select, text
+from sqlalchemy.orm import deferred
+
+from database import Database
+from search import TSVector
+
+db = Database()
+
+
+venue_genre = db.Table(
+    "venue_genre",
+    db.Column(
+        "venue_id",
+        db.Integer,
+        db.ForeignKey("venue.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    db.Column(
+        "genre_id",
+        db.Integer,
+        db.ForeignKey("genre.id"),
+        primary_key=True,
+        index=True,
+    ),
+)
+
+artist_genre = db.Table(
+    "artist_genre",
+    db.Column(
+        "artist_id",
+        db.Integer,
+        db.ForeignKey("artist.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    db.Column(
+        "genre_id",
+        db.Integer,
+        db.ForeignKey("genre.id"),
+        primary_key=True,
+        index=True,
+    ),
+)
+
+
+class Genre(db.Model):
+    __tablename__ = "genre"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), nullable=False, unique=True)
+
+    def __repr__(self):
+        return f"<genre {self.id} {self.name}>"
+
+    @classmethod
+    def from_names(cls, names):
+        # the rows for the given genre names, new ones created as needed;
+        # a name given twice would otherwise be inserted twice
+        names = list(dict.fromkeys(names))
+        existing = {
+            genre.name: genre
+            for genre in cls.query.filter(cls.name.in_(names)).all()
+        }
+        return [existing.get(name) or cls(name=name) for name in names]
+
+
+# SQLSTATE of a violated exclusion constraint (PostgreSQL)
+EXCLUSION_VIOLATION = "23P01"
+# length of a show: an artist or venue can't be booked twice this close.
+# The show_slot_exclusion migration builds its constraints from it, so
+# changing it needs a new migration recreating them.
+SHOW_SLOT_HOURS = 3
+
+
+class Show(db.Model):
+    __tablename__ = "show"
+    # no artist or venue is booked twice within SHOW_SLOT_HOURS; enforced by
+    # the show_*_slot_excl exclusion constraints, see the show_slot_exclusion
+    # migration
+    __table_args__ = (
+        db.Index("ix_show_venue_id_start_time", "venue_id", "start_time"),
+        db.Index("ix_show_artist_id_start_time", "artist_id", "start_time"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    venue_id = db.Column(
+        db.Integer,
+        db.ForeignKey("venue.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    artist_id = db.Column(
+        db.Integer,
+        db.ForeignKey("artist.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    start_time = db.Column(db.DateTime(), nullable=False, index=True)
+    updated_at = db.Column(
+        db.DateTime(),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
+    artist = db.relationship("Artist", back_populates="parents")
+    venue = db.relationship("Venue", back_populates="children")
+
+    def __repr__(self):
+        return f"<venue {self.venue_id} {self.artist_id} {self.start_time}>"
+
+
+class Venue(db.Model):
+    __tablename__ = "venue"
+    __table_args__ = (
+        db.Index("ix_venue_state_city", "state", "city"),
+        db.Index(
+            "ix_venue_search_vector", "search_vector", postgresql_using="gin"
+        ),
+        db.Index(
+            "ix_venue_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(), nullable=False)
+    city = db.Column(db.String(120), nullable=False)
+    state = db.Column(db.String(120), nullable=False)
+    address = db.Column(db.String(120), nullable=False)
+    phone = db.Column(db.String(120), nullable=False)
+    image_link = db.Column(db.String(500), nullable=False)
+    facebook_link = db.Column(db.String(120), nullable=False)
+    website = db.Column(db.String(120), nullable=False)
+    genres = db.relationship(
+        "Genre",
+        secondary=venue_genre,
+        order_by="Genre.name",
+        passive_deletes=True,
+    )
+    seeking_talent = db.Column(db.Boolean(), default=False, nullable=False)
+    seeking_description = db.Column(db.String(500), nullable=False)
+    search_vector = deferred(db.Column(TSVector()))
+    updated_at = db.Column(
+        db.DateTime(),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
+    children = db.relationship(
+        "Show", back_populates="venue", passive_deletes=True
+    )
+
+    def __repr__(self):
+        return f"<venue {self.id} {self.name}>"
+
+    @property
+    def genre_names(self):
+        return [genre.name for genre in self.genres]
+
+    # TODO: implement any missing fields, as a database migration using Flask-Migrate [Done]
+
+
+class Artist(db.Model):
+    __tablename__ = "artist"
+    __table_args__ = (
+        db.Index("ix_artist_state_city", "state", "city"),
+        db.Index(
+            "ix_artist_search_vector", "search_vector", postgresql_using="gin"
+        ),
+        db.Index(
+            "ix_artist_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(), nullable=False, index=True)
+    city = db.Column(db.String(120), nullable=False)
+    state = db.Column(db.String(120), nullable=False)
+    phone = db.Column(db.String(120), nullable=False)
+    genres = db.relationship(
+        "Genre",
+        secondary=artist_genre,
+        order_by="Genre.name",
+        passive_deletes=True,
+    )
+    image_link = db.Column(db.String(500), nullable=False)
+    website = db.Column(db.String(120), nullable=False)
+    facebook_link = db.Column(db.String(120), nullable=False)
+    seeking_venue = db.Column(db.Boolean(), default=False, nullable=False)
+    seeking_description = db.Column(db.String(500), nullable=False)
+    search_vector = deferred(db.Column(TSVector()))
+    updated_at = db.Column(
+        db.DateTime(),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
+    parents = db.relationship(
+        "Show", back_populates="artist", passive_deletes=True
+    )
+
+    def __repr__(self):
+        return f"<artist {self.id} {self.name}>"
+
+    @property
+    def genre_names(self):
+        return [genre.name for genre in self.genres]
+
+    # TODO: implement any missing fields, as a database migration using Flask-Migrate [Done]
+
+
+# TODO Implement Show and Artist models, and complete all model relationships and properties, as a database migration. [Done]
+
+
+# Upcoming and past show counts per venue and artist. On PostgreSQL these are
+# materialized views (see the add_show_counts migration) that only
+# refresh_show_counts updates; every other database gets plain tables.
+class VenueShowCount(db.Model):
+    __tablename__ = "venue_show_counts"
+    __table_args__ = {"info": {"is_view": True}}
+
+    venue_id = db.Column(db.Integer, primary_key=True)
+    upcoming_shows = db.Column(db.Integer, nullable=False)
+    past_shows = db.Column(db.Integer, nullable=False)
+    refreshed_at = db.Column(db.DateTime(), nullable=False)
+
+
+class ArtistShowCount(db.Model):
+    __tablename__ = "artist_show_counts"
+    __table_args__ = {"info": {"is_view": True}}
+
+    artist_id = db.Column(db.Integer, primary_key=True)
+    upcoming_shows = db.Column(db.Integer, nullable=False)
+    past_shows = db.Column(db.Integer, nullable=False)
+    refreshed_at = db.Column(db.DateTime(), nullable=False)
+
+
+def refresh_show_counts():
+    # shows turn from upcoming to past as time goes by, so the counts are
+    # recomputed on a schedule (flask refresh-show-counts) rather than
+    # maintained on every write
+    if db.engine.dialect.name == "postgresql":
+        for model in (VenueShowCount, ArtistShowCount):
+            # CONCURRENTLY: pages keep reading the old counts meanwhile
+            db.session.execute(
+                text(
+                    "REFRESH MATERIALIZED VIEW CONCURRENTLY "
+                    + model.__tablename__
+                )
+            )
+    else:
+        now = datetime.today()
+        for model, key in (
+            (VenueShowCount, Show.venue_id),
+            (ArtistShowCount, Show.artist_id),
+        ):
+            counts = db.session.query(
+                key,
+                func.count(Show.id).filter(Show.start_time > now),
+                func.count(Show.id).filter(Show.start_time <= now),
+                literal(now, db.DateTime()),
+            ).group_by(key)
+            db.session.execute(model.__table__.delete())
+            db.session.execute(
+                model.__table__.insert().from_select(
+                    model.__table__.columns, counts.statement
+                )
+            )
+    db.session.commit()
+
+
+signals = Namespace()
+# sent by the callers of delete_with_shows once the delete committed, with
+# the ids of the venues and artists whose pages listed what was deleted
+entity_deleted = signals.signal("entity-deleted")
+
+
+def delete_with_shows(model, entity_id, batch_size=None):
+    """Delete a venue or an artist along with its shows and genres.
+
+    Deletes are set-based: the shows are never loaded into the session.
+    With batch_size they go batch_size at a time, each batch in its own
+    transaction, so a long history doesn't hold its row locks until the
+    end; if a batch fails, the ones before it stay deleted and running it
+    again finishes the job. Returns the name of the deleted row and the
+    entity_deleted arguments, or None if there was no such row.
+    """
+    key, other_key, genre_table = {
+        Venue: (Show.venue_id, Show.artist_id, venue_genre),
+        Artist: (Show.artist_id, Show.venue_id, artist_genre),
+    }[model]
+    name = db.session.query(model.name).filter(model.id == entity_id).scalar()
+    if name is None:
+        return None
+    other_ids = [
+        other_id
+        for (other_id,) in db.session.query(other_key)
+        .filter(key == entity_id)
+        .distinct()
+    ]
+    shows = Show.__table__
+    if batch_size:
+        while True:
+            batch = (
+                select(shows.c.id).where(key == entity_id).limit(batch_size)
+            )
+            deleted = db.session.execute(
+                shows.delete().where(shows.c.id.in_(batch.scalar_subquery()))
+            ).rowcount
+            db.session.commit()
+            if deleted < batch_size:
+                break
+    else:
+        db.session.execute(shows.delete().where(key == entity_id))
+    # ON DELETE CASCADE would take care of these on PostgreSQL, but SQLite
+    # doesn't enforce foreign keys unless told to
+    genre_key = genre_table.c[key.key]
+    db.session.execute(genre_table.delete().where(genre_key == entity_id))
+    db.session.execute(model.__table__.delete().where(model.id == entity_id))
+    db.session.commit()
+    if model is Venue:
+        ids = {"venue_ids": [entity_id], "artist_ids": other_ids}
+    else:
+        ids = {"venue_ids": other_ids, "artist_ids": [entity_id]}
+    return name, ids
+
+
+@db.event.listens_for(db.session, "before_flush")
+def touch_updated_at(session, flush_context, instances):
+    # changing only a collection such as genres emits no UPDATE of the row,
+    # so onupdate alone would leave updated_at behind
+    for instance in session.dirty:
+        if hasattr(instance, "updated_at") and session.is_modified(instance):
+            instance.updated_at = datetime.utcnow()
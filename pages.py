@@ -0,0 +1,375 @@
+"""Helpers shared by the page controllers.
+
+Keyset pagination and streamed listings, the page cache and its
+invalidation, conditional requests (ETag/Last-Modified) and the dicts pages
+are rendered from.
+"""
+
+import hashlib
+from datetime import datetime
+
+from flask import (
+    abort,
+    current_app,
+    g,
+    get_flashed_messages,
+    request,
+    session,
+    stream_template,
+)
+from sqlalchemy import desc, tuple_
+
+from cache import Cache
+from models import Show, db, entity_deleted
+
+# ----------------------------------------------------------------------------#
+# Pagination.
+# ----------------------------------------------------------------------------#
+
+
+def parse_cursor(cursor, types):
+    # cursors are the sort values of a row joined by commas, id last,
+    # e.g. "The Wild Sax Band,3" or "CA,San Francisco,3". The id never
+    # holds a comma and the fields before the one preceding it (a state)
+    # don't either, so the field just before the id (a name or a city)
+    # takes whatever commas are left.
+    if not cursor:
+        return None
+    if len(types) == 1:
+        values = [cursor]
+    else:
+        head, _, last = cursor.rpartition(",")
+        values = head.split(",", len(types) - 2) + [last]
+    if len(values) != len(types):
+        abort(400)
+    try:
+        return [convert(value) for convert, value in zip(types, values)]
+    except ValueError:
+        abort(400)
+
+
+def paginate(query, columns, types):
+    """Keyset-paginate query on columns using the request arguments.
+
+    ``?after=<cursor>`` returns the rows following a cursor and
+    ``?before=<cursor>`` the rows preceding it; ``?limit=`` is capped at
+    MAX_PAGE_SIZE. Returns the rows and a dict holding the cursors of the
+    previous and next pages (None when there is no such page).
+    """
+    query, window = page_query(query, columns, types)
+    return page_rows(query.all(), columns, window)
+
+
+def page_query(query, columns, types):
+    # the query (or select) of the requested page, plus one row telling
+    # whether there is another page; see paginate
+    config = current_app.config
+    limit = request.args.get("limit", config["PAGE_SIZE"], type=int)
+    limit = max(1, min(limit, config["MAX_PAGE_SIZE"]))
+    after = parse_cursor(request.args.get("after"), types)
+    before = parse_cursor(request.args.get("before"), types)
+    key = tuple_(*columns)
+    if before is not None:
+        query = query.filter(key < tuple_(*before)).order_by(
+            *[desc(column) for column in columns]
+        )
+    else:
+        if after is not None:
+            query = query.filter(key > tuple_(*after))
+        query = query.order_by(*columns)
+    return query.limit(limit + 1), (limit, after, before)
+
+
+def row_cursor(row, columns):
+    return ",".join(str(getattr(row, column.key)) for column in columns)
+
+
+def page_rows(rows, columns, window):
+    # the rows of page_query's query, and the cursors around them
+    limit, after, before = window
+    if before is not None:
+        has_prev = len(rows) > limit
+        rows = rows[:limit][::-1]
+        has_next = True
+    else:
+        has_prev = after is not None
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+    page = {"limit": limit, "prev": None, "next": None}
+    if rows and has_prev:
+        page["prev"] = row_cursor(rows[0], columns)
+    if rows and has_next:
+        page["next"] = row_cursor(rows[-1], columns)
+    return rows, page
+
+
+# rows fetched per round trip by stream_page
+STREAM_FETCH_SIZE = 100
+# bytes of HTML sent per chunk by stream_listing
+STREAM_CHUNK_SIZE = 2048
+
+
+def stream_page(query, columns, types):
+    """Like paginate, for pages rendered while their rows are fetched.
+
+    Returns an iterator over the rows and the page dict, whose cursors are
+    only filled in once the iterator is exhausted, so templates have to
+    render the pager after the rows. ?before= pages come from the database
+    backwards and are fetched whole.
+    """
+    query, window = page_query(query, columns, types)
+    limit, after, before = window
+    page = {"limit": limit, "prev": None, "next": None}
+
+    def iterate():
+        if before is not None:
+            rows, cursors = page_rows(query.all(), columns, window)
+            page.update(cursors)
+            yield from rows
+            return
+        first = last = None
+        for count, row in enumerate(query.yield_per(STREAM_FETCH_SIZE), 1):
+            if count > limit:
+                page["next"] = row_cursor(last, columns)
+                break
+            if first is None:
+                first = row
+            last = row
+            yield row
+        if first is not None and after is not None:
+            page["prev"] = row_cursor(first, columns)
+
+    return iterate(), page
+
+
+def stream_listing(template, **context):
+    """stream_template for the listing pages, in chunks of a few KB.
+
+    The session goes out with the headers, before the template runs, so
+    the messages flashed for the page are taken out of it first.
+    """
+    get_flashed_messages()
+    # runs in the request context it is called in, to the last chunk
+    stream = stream_template(template, **context)
+
+    def chunks():
+        buffer = []
+        size = 0
+        for chunk in stream:
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= STREAM_CHUNK_SIZE:
+                yield "".join(buffer)
+                buffer = []
+                size = 0
+        yield "".join(buffer)
+
+    return chunks()
+
+
+# ----------------------------------------------------------------------------#
+# Caching.
+# ----------------------------------------------------------------------------#
+
+# shared by the index, listing and detail controllers; see CACHE_BACKEND
+cache = Cache()
+
+
+def now_bucket(now):
+    # cached pages hold on to the "now" that split past from upcoming shows
+    # for at most one bucket
+    return int(now.timestamp() // current_app.config["CACHE_NOW_BUCKET"])
+
+
+def listing_cache_key(now):
+    return cache.key(
+        "listings",
+        "{}?{}@{}".format(
+            request.endpoint, request.query_string.decode(), now_bucket(now)
+        ),
+    )
+
+
+def cache_listing(items, cache_key, page):
+    """Yield items, then cache them and page as the listing at cache_key.
+
+    For streamed listings: only a page rendered to the end is cached.
+    """
+    data = []
+    for item in items:
+        data.append(item)
+        yield item
+    cache.set(cache_key, (data, page))
+
+
+def invalidate_pages(venue_ids=(), artist_ids=()):
+    # listings show names and images too, so they go along with any entity
+    cache.invalidate(
+        "listings",
+        *["venue:{}".format(venue_id) for venue_id in venue_ids],
+        *["artist:{}".format(artist_id) for artist_id in artist_ids]
+    )
+
+
+@entity_deleted.connect
+def invalidate_deleted(sender, venue_ids, artist_ids):
+    # the show counts of the other side catch up at the next scheduled
+    # flask refresh-show-counts, like after any other write
+    invalidate_pages(venue_ids=venue_ids, artist_ids=artist_ids)
+
+
+def venue_artist_ids(venue_id):
+    # artists whose pages show this venue
+    rows = (
+        db.session.query(Show.artist_id)
+        .filter(Show.venue_id == venue_id)
+        .distinct()
+    )
+    return [artist_id for (artist_id,) in rows]
+
+
+def artist_venue_ids(artist_id):
+    # venues whose pages show this artist
+    rows = (
+        db.session.query(Show.venue_id)
+        .filter(Show.artist_id == artist_id)
+        .distinct()
+    )
+    return [venue_id for (venue_id,) in rows]
+
+
+# ----------------------------------------------------------------------------#
+# Conditional requests.
+# ----------------------------------------------------------------------------#
+
+
+def bucket_start(now):
+    # pages splitting shows at "now" change whenever the bucket does
+    seconds = current_app.config["CACHE_NOW_BUCKET"]
+    return datetime.utcfromtimestamp(now_bucket(now) * seconds)
+
+
+def listing_validators(now):
+    # every write that changes a listing invalidates "listings" (see
+    # invalidate_pages), so its version and the "now" bucket tell the
+    # versions of a listing apart without querying whole tables
+    return now_bucket(now), cache.version("listings")
+
+
+def abort_if_not_modified(*parts):
+    """Answer 304 when the client already has the page described by parts.
+
+    parts are whatever the page depends on: the updated_at of the rows it
+    shows (the latest is sent as Last-Modified), row counts, cache
+    versions, request arguments. The ETag hashes all of them; pages
+    without dated parts get no Last-Modified. Otherwise the validators are
+    kept on g for add_validators to set on the rendered response.
+    """
+    last_modified = max(
+        (part for part in parts if isinstance(part, datetime)), default=None
+    )
+    if last_modified is not None:
+        last_modified = last_modified.replace(microsecond=0)
+    # dates render in the request's locale and time zone
+    request_parts = (
+        request.path,
+        request.query_string,
+        g.get("locale"),
+        request.cookies.get("timezone"),
+    )
+    etag = hashlib.md5(repr(request_parts + parts).encode("utf-8")).hexdigest()
+    g.etag = etag
+    g.last_modified = last_modified
+    # a 304 would swallow messages flashed for this page
+    if session.get("_flashes"):
+        return
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+    elif request.if_modified_since and last_modified is not None:
+        since = request.if_modified_since.replace(tzinfo=None)
+        not_modified = last_modified <= since
+    else:
+        not_modified = False
+    if not_modified:
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        abort(response)
+
+
+def add_validators(response):
+    # after every request, see create_app
+    if response.status_code == 200 and "etag" in g:
+        response.set_etag(g.etag)
+        if g.last_modified is not None:
+            response.last_modified = g.last_modified
+        # let browsers and the CDN keep the page but always revalidate
+        response.cache_control.no_cache = True
+    return response
+
+
+# ----------------------------------------------------------------------------#
+# Serialization.
+# ----------------------------------------------------------------------------#
+
+# what the detail pages and the API show of each entity
+VENUE_FIELDS = (
+    "id",
+    "name",
+    "genres",
+    "address",
+    "city",
+    "state",
+    "phone",
+    "website",
+    "facebook_link",
+    "seeking_talent",
+    "seeking_description",
+    "image_link",
+)
+ARTIST_FIELDS = (
+    "id",
+    "name",
+    "genres",
+    "city",
+    "state",
+    "phone",
+    "website",
+    "facebook_link",
+    "seeking_venue",
+    "seeking_description",
+    "image_link",
+)
+SHOW_FIELDS = ("id", "venue_id", "artist_id", "start_time")
+
+
+def entity_dict(entity, fields):
+    # only the given fields are read, so unloaded columns stay unloaded
+    data = {}
+    for field in fields:
+        if field == "genres":
+            data[field] = entity.genre_names
+        else:
+            data[field] = getattr(entity, field)
+    return data
+
+
+def venue_show_dict(show):
+    # a show as listed on its venue's page; needs show.artist loaded
+    return {
+        "artist_id": show.artist.id,
+        "artist_name": show.artist.name,
+        "artist_image_link": show.artist.image_link,
+        "start_time": show.start_time,
+    }
+
+
+def artist_show_dict(show):
+    # a show as listed on its artist's page; needs show.venue loaded
+    return {
+        "venue_id": show.venue.id,
+        "venue_name": show.venue.name,
+        "venue_image_link": show.venue.image_link,
+        "start_time": show.start_time,
+    }
@@ -0,0 +1,117 @@
+import re
+
+from sqlalchemy import case, desc, func, or_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.types import Text, TypeDecorator
+
+# searched besides the name, and weighted into the tsvector triggers
+SEARCH_FIELDS = ("city", "genres", "seeking_description")
+
+
+class TSVector(TypeDecorator):
+    """tsvector on PostgreSQL, plain text elsewhere (e.g. SQLite in tests).
+
+    The value is maintained by a database trigger, see the
+    add_search_vectors migration, and never written by the app.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(TSVECTOR())
+        return dialect.type_descriptor(Text())
+
+
+def prefix_tsquery(term):
+    # "musical ho" -> "musical:* & ho:*" so partial words still match
+    words = re.findall(r"\w+", term)
+    return " & ".join("{}:*".format(word) for word in words)
+
+
+def field_match(model, field, pattern):
+    attribute = getattr(model, field)
+    if hasattr(attribute.property, "mapper"):
+        # a relationship such as genres: match the name of a related row
+        related = attribute.property.mapper.class_
+        return attribute.any(related.name.ilike(pattern))
+    return attribute.ilike(pattern)
+
+
+def search_queries(query, model, term, limit, dialect, fields=SEARCH_FIELDS):
+    """The queries full_text_search runs, for a query or select on model.
+
+    Returns the main query and, on PostgreSQL, the trigram similarity
+    fallback to run when the main one finds nothing (None elsewhere).
+    """
+    term = term.strip()
+    pattern = "%{}%".format(term)
+    if dialect != "postgresql":
+        name_match = model.name.ilike(pattern)
+        matches = (
+            query.filter(
+                or_(
+                    name_match,
+                    *[field_match(model, field, pattern) for field in fields]
+                )
+            )
+            .order_by(case([(name_match, 0)], else_=1), model.id)
+            .limit(limit)
+        )
+        return matches, None
+
+    tsquery = prefix_tsquery(term)
+    if tsquery:
+        ts_query = func.to_tsquery("simple", tsquery)
+        matches = (
+            query.filter(
+                or_(
+                    model.search_vector.op("@@")(ts_query),
+                    model.name.ilike(pattern),
+                )
+            )
+            .order_by(
+                desc(
+                    func.ts_rank(model.search_vector, ts_query)
+                    + func.similarity(model.name, term)
+                ),
+                model.id,
+            )
+            .limit(limit)
+        )
+    else:
+        matches = (
+            query.filter(model.name.ilike(pattern))
+            .order_by(model.id)
+            .limit(limit)
+        )
+    fallback = (
+        query.filter(model.name.op("%")(term))
+        .order_by(desc(func.similarity(model.name, term)), model.id)
+        .limit(limit)
+    )
+    return matches, fallback
+
+
+def full_text_search(model, term, limit, fields=SEARCH_FIELDS):
+    """Search a Venue/Artist-like model for term, best matches first.
+
+    On PostgreSQL rows match the ranked tsvector query or a case-insensitive
+    substring of the name (served by the trigram index); when nothing
+    matches, trigram similarity on the name is used to forgive typos.
+    Other databases get a case-insensitive LIKE over name and fields.
+    """
+    query = model.query
+    matches, fallback = search_queries(
+        query,
+        model,
+        term,
+        limit,
+        query.session.get_bind().dialect.name,
+        fields,
+    )
+    matches = matches.all()
+    if matches or fallback is None:
+        return matches
+    return fallback.all()
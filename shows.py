@@ -0,0 +1,175 @@
+import sys
+from datetime import datetime, timedelta
+
+import dateutil.parser
+from flask import (
+    Blueprint,
+    flash,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+
+from models import (
+    EXCLUSION_VIOLATION,
+    SHOW_SLOT_HOURS,
+    Artist,
+    Show,
+    Venue,
+    db,
+)
+from pages import (
+    abort_if_not_modified,
+    cache,
+    cache_listing,
+    invalidate_pages,
+    listing_cache_key,
+    listing_validators,
+    stream_listing,
+    stream_page,
+)
+
+bp = Blueprint("shows", __name__)
+
+
+@bp.route("/shows")
+def shows():
+    # displays list of shows at /shows
+    # [done] TODO: replace with real venues data.
+    #       num_shows should be aggregated based on number of upcoming shows per venue.
+    now = datetime.today()
+    abort_if_not_modified(*listing_validators(now))
+    cache_key = listing_cache_key(now)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        data, page = cached
+        return stream_listing("pages/shows.html", shows=data, page=page)
+    # plain rows rather than Show objects, which would pile up in the
+    # session while the page streams; see stream_page
+    shows, page = stream_page(
+        Show.query.join(Show.venue)
+        .join(Show.artist)
+        .filter(Show.start_time > now)
+        .with_entities(
+            Show.id,
+            Show.updated_at,
+            Show.start_time,
+            Venue.updated_at.label("venue_updated_at"),
+            Artist.updated_at.label("artist_updated_at"),
+            Venue.id.label("venue_id"),
+            Venue.name.label("venue_name"),
+            Artist.id.label("artist_id"),
+            Artist.name.label("artist_name"),
+            Artist.image_link.label("artist_image_link"),
+        ),
+        (Show.start_time, Show.id),
+        (datetime.fromisoformat, int),
+    )
+    data = (
+        {
+            "id": show.id,
+            # with the id, the key of its card's {% cache %} fragment
+            "updated_at": max(
+                show.updated_at, show.venue_updated_at, show.artist_updated_at
+            ),
+            "venue_id": show.venue_id,
+            "venue_name": show.venue_name,
+            "artist_id": show.artist_id,
+            "artist_name": show.artist_name,
+            "artist_image_link": show.artist_image_link,
+            "start_time": show.start_time,
+        }
+        for show in shows
+    )
+    return stream_listing(
+        "pages/shows.html",
+        shows=cache_listing(data, cache_key, page),
+        page=page,
+    )
+
+
+@bp.route("/shows/create")
+def create_shows():
+    from forms import ShowForm
+
+    # renders form. do not touch.
+    form = ShowForm()
+    return render_template("forms/new_show.html", form=form)
+
+
+@bp.route("/shows/create", methods=["POST"])
+def create_show_submission():
+    # called to create new shows in the db, upon submitting new show listing form
+    # [done] TODO: insert form data as a new Show record in the db, instead [Done]
+    show_info = request.form
+    try:
+        artist_id = int(show_info["artist_id"])
+        venue_id = int(show_info["venue_id"])
+        start_time = dateutil.parser.parse(show_info["start_time"])
+    except (KeyError, ValueError, OverflowError):
+        # ParserError is a ValueError
+        flash("Please enter an artist ID, a venue ID and a start time.")
+        return redirect(url_for(".create_shows"))
+    if (
+        db.session.get(Artist, artist_id) is None
+        or db.session.get(Venue, venue_id) is None
+    ):
+        flash("There is no artist or venue with this ID.")
+        return redirect(url_for(".create_shows"))
+    # the artist and the venue each take one show per slot; the exclusion
+    # constraints on show enforce the same under concurrent submissions
+    slot = timedelta(hours=SHOW_SLOT_HOURS)
+    conflict = (
+        db.session.query(Show.id)
+        .filter(
+            and_(
+                or_(
+                    Show.artist_id == artist_id,
+                    Show.venue_id == venue_id,
+                ),
+                Show.start_time > start_time - slot,
+                Show.start_time < start_time + slot,
+            )
+        )
+        .first()
+    )
+    if conflict is not None:
+        flash("This time was booked. Please reselect.")
+        return redirect(url_for(".create_shows"))
+    try:
+        show = Show(
+            start_time=start_time,
+            artist_id=artist_id,
+            venue_id=venue_id,
+        )
+        db.session.add(show)
+        db.session.commit()
+        invalidate_pages(
+            venue_ids=[venue_id],
+            artist_ids=[artist_id],
+        )
+        # on successful db insert, flash success
+        flash("Show was successfully listed!")
+    except IntegrityError as e:
+        db.session.rollback()
+        if getattr(e.orig, "pgcode", None) != EXCLUSION_VIOLATION:
+            print(sys.exc_info())
+            flash("An error occurred. Show could not be listed.")
+        else:
+            # booked by a concurrent submission since the check above
+            flash("This time was booked. Please reselect.")
+            return redirect(url_for(".create_shows"))
+    except:
+        db.session.rollback()
+        print(sys.exc_info())
+        flash("An error occurred. Show could not be listed.")
+    finally:
+        db.session.close()
+    # on successful db insert, flash success
+    # [done] TODO: on unsuccessful db insert, flash an error instead.
+    # e.g., flash('An error occurred. Show could not be listed.')
+    # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+    return render_template("pages/home.html")
@@ -0,0 +1,91 @@
+"""How templates are loaded: bytecode cache, precompiled bundle, warm-up.
+
+Jinja turns a template into Python source, then bytecode, the first time
+a process renders it. TEMPLATE_CACHE_DIR keeps that bytecode on disk for
+the other workers and the next deploy, flask compile-templates writes all
+templates as Python modules to TEMPLATE_BUNDLE at build time, and with
+TEMPLATE_WARM_UP create_app loads every template before the first request.
+"""
+import compileall
+import os
+import shutil
+
+from jinja2 import ChoiceLoader, FileSystemBytecodeCache, ModuleLoader
+
+from filters import DATETIME_FORMATS, datetime_pattern
+
+# pages/home.css lives in templates/ too
+TEMPLATE_EXTENSIONS = (".html",)
+
+
+def is_template(name):
+    return name.endswith(TEMPLATE_EXTENSIONS)
+
+
+def template_names(app):
+    return [
+        name for name in app.jinja_loader.list_templates() if is_template(name)
+    ]
+
+
+def bundle_is_current(app, bundle):
+    # a bundle older than one of the templates would render its old version
+    if not os.path.isdir(bundle):
+        return False
+    built = os.path.getmtime(bundle)
+    folder = app.jinja_loader.searchpath[0]
+    return all(
+        os.path.getmtime(os.path.join(folder, name)) <= built
+        for name in template_names(app)
+    )
+
+
+def init_app(app):
+    """Set up the Jinja environment; call before app.jinja_env is used.
+
+    The bundle is only loaded outside debug mode, where templates are
+    edited, and while it is newer than all of the templates.
+    """
+    config = app.config
+    options = {}
+    if config["TEMPLATE_CACHE_DIR"]:
+        os.makedirs(config["TEMPLATE_CACHE_DIR"], exist_ok=True)
+        options["bytecode_cache"] = FileSystemBytecodeCache(
+            config["TEMPLATE_CACHE_DIR"]
+        )
+    bundle = config["TEMPLATE_BUNDLE"]
+    if bundle and not app.debug:
+        if bundle_is_current(app, bundle):
+            # templates missing from the bundle still load from the folder
+            options["loader"] = ChoiceLoader(
+                [ModuleLoader(bundle), app.create_global_jinja_loader()]
+            )
+        elif os.path.isdir(bundle):
+            app.logger.warning(
+                "%s is older than the templates and is ignored, "
+                "run flask compile-templates",
+                bundle,
+            )
+    app.jinja_options = dict(app.jinja_options, **options)
+
+
+def compile_bundle(app, target):
+    """Compile the app's templates into modules in target; returns them."""
+    shutil.rmtree(target, ignore_errors=True)
+    names = template_names(app)
+    # from the sources, even if the app loads an older bundle
+    environment = app.jinja_env.overlay(loader=app.jinja_loader)
+    environment.compile_templates(
+        target, zip=None, filter_func=is_template, ignore_errors=False
+    )
+    # so read-only deploys don't compile the modules on every start
+    compileall.compile_dir(target, quiet=1)
+    return names
+
+
+def warm_up(app):
+    """Load every template, and the date formats pages use."""
+    for name in template_names(app):
+        app.jinja_env.get_template(name)
+    for format in DATETIME_FORMATS.values():
+        datetime_pattern(format, app.config["DEFAULT_LOCALE"])
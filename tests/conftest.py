@@ -0,0 +1,71 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import event
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import dataset  # noqa: E402
+from models import db  # noqa: E402
+
+TEST_CONFIG = {
+    "WTF_CSRF_ENABLED": False,
+    "TEMPLATE_CACHE_DIR": None,
+    "TEMPLATE_BUNDLE": None,
+    "TEMPLATE_WARM_UP": False,
+}
+
+
+@pytest.fixture
+def seeded(tmp_path):
+    """Build the app on a fresh database seeded by benchmarks/dataset.py."""
+    databases = iter(range(1000))
+
+    def seeded(venues=20, artists=20, shows=100, **config):
+        database = "sqlite:///{}".format(
+            tmp_path / "fyyur-{}.db".format(next(databases))
+        )
+        app, _ = dataset.create_bench_app(
+            database, **dict(TEST_CONFIG, **config)
+        )
+        with app.app_context():
+            dataset.seed(venues, artists, shows)
+        return app
+
+    return seeded
+
+
+@pytest.fixture
+def app(seeded):
+    return seeded()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_statements():
+    """Request a URL; returns the response and the statements it ran."""
+
+    def count_statements(app, url, **kwargs):
+        with app.app_context():
+            engine = db.engine
+        statements = []
+
+        def count(*args):
+            statements.append(args[2])
+
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            # streamed pages run their queries while the body is read
+            response = app.test_client().get(url, buffered=True, **kwargs)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        return response, len(statements)
+
+    return count_statements
@@ -0,0 +1,35 @@
+def test_list_pages_follow_cursors(client):
+    ids = []
+    url = "/api/v1/venues?limit=6&fields=id"
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        body = response.get_json()
+        ids.extend(venue["id"] for venue in body["data"])
+        after = body["page"]["next"]
+        url = after and "/api/v1/venues?limit=6&fields=id&after=" + after
+    assert ids == list(range(1, 21))
+
+    body = client.get("/api/v1/venues?limit=6&fields=id&after=12").get_json()
+    assert [venue["id"] for venue in body["data"]] == list(range(13, 19))
+    before = body["page"]["prev"]
+    response = client.get("/api/v1/venues?limit=6&fields=id&before=" + before)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [venue["id"] for venue in body["data"]] == list(range(7, 13))
+    assert body["page"]["prev"] == "7"
+
+
+def test_list_rejects_bad_cursors(client):
+    for cursor in ("x", "1,2"):
+        response = client.get("/api/v1/shows?after=" + cursor)
+        assert response.status_code == 400
+        assert response.get_json() == {"error": "Bad Request"}
+
+
+def test_batch_lookup_and_embeds(client):
+    response = client.get("/api/v1/artists?ids=3,1&embed=shows&fields=id")
+    data = response.get_json()["data"]
+    assert [artist["id"] for artist in data] == [1, 3]
+    assert all("shows" in artist for artist in data)
+    assert client.get("/api/v1/artists/999").status_code == 404
@@ -0,0 +1,51 @@
+import subprocess
+import sys
+
+import pytest
+
+from app import create_app
+from conftest import ROOT
+
+SQLITE = {"SQLALCHEMY_DATABASE_URI": "sqlite://", "TESTING": True}
+
+
+def test_blueprints():
+    app = create_app(SQLITE)
+    assert {"main", "venues", "artists", "shows", "api", "assets"} <= set(
+        app.blueprints
+    )
+    assert "metrics" in app.view_functions
+
+
+def test_settings_precedence(monkeypatch):
+    monkeypatch.setenv("FYYUR_PAGE_SIZE", "7")
+    monkeypatch.setenv("FYYUR_MAX_PAGE_SIZE", "70")
+    app = create_app(dict(SQLITE, MAX_PAGE_SIZE=700))
+    assert app.config["PAGE_SIZE"] == 7
+    assert app.config["MAX_PAGE_SIZE"] == 700
+    # apps don't share their settings
+    assert create_app(SQLITE).config["MAX_PAGE_SIZE"] == 70
+
+
+def test_secret_key_is_required(monkeypatch):
+    monkeypatch.delenv("FYYUR_SECRET_KEY", raising=False)
+    with pytest.raises(RuntimeError):
+        create_app(
+            dict(SQLITE, TESTING=False, DEBUG=False, SECRET_KEY=None)
+        )
+
+
+def test_startup_skips_cli_and_render_modules():
+    code = (
+        "import sys, app; app.create_app({!r}); "
+        "print(' '.join(sorted(sys.modules)))".format(SQLITE)
+    )
+    modules = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    for module in ("flask_migrate", "forms", "wtforms", "babel"):
+        assert module not in modules
@@ -0,0 +1,93 @@
+import gzip
+import json
+import os
+import re
+
+import pytest
+
+from assets import HASH_LENGTH, MANIFEST, rewrite_css_urls
+
+
+@pytest.fixture
+def build(app, tmp_path, monkeypatch):
+    # outside debug mode the app logs to error.log in the working directory
+    monkeypatch.chdir(tmp_path)
+    build_dir = str(tmp_path / "build")
+    result = app.test_cli_runner().invoke(
+        args=["build-assets", "--output", build_dir]
+    )
+    assert result.exit_code == 0, result.output
+    with open(os.path.join(build_dir, MANIFEST)) as file:
+        return build_dir, json.load(file)
+
+
+def test_build(app, build):
+    build_dir, manifest = build
+    built = manifest["files"]["css/main.css"]
+    assert re.fullmatch(
+        r"css/main\.[0-9a-f]{{{}}}\.css".format(HASH_LENGTH), built
+    )
+    with open(os.path.join(app.static_folder, "css", "main.css"), "rb") as f:
+        source = f.read()
+    with gzip.open(os.path.join(build_dir, built + ".gz")) as file:
+        assert file.read() == source
+    assert "gzip" in manifest["encodings"][built]
+    # urls of files missing from static/ are left as they are
+    bootstrap = manifest["files"]["css/bootstrap.css"]
+    with open(os.path.join(build_dir, bootstrap)) as file:
+        css = file.read()
+    assert 'url("../fonts/glyphicons-halflings-regular.woff2")' in css
+    # images don't get compressed copies
+    image = manifest["files"]["img/front-splash.jpg"]
+    assert manifest["encodings"][image] == []
+
+
+def test_rewrite_css_urls():
+    css = (
+        b'a{background:url("../img/a.png?v=1")}'
+        b"b{background:url(../img/missing.png)}"
+        b"c{background:url(data:image/png;base64,AAAA)}"
+        b"d{background:url('/img/a.png')}"
+    )
+    files = {"img/a.png": "img/a.0123456789.png"}
+    assert rewrite_css_urls("css/main.css", css, files) == (
+        b'a{background:url("../img/a.0123456789.png?v=1")}'
+        b"b{background:url(../img/missing.png)}"
+        b"c{background:url(data:image/png;base64,AAAA)}"
+        b"d{background:url('/img/a.png')}"
+    )
+
+
+def test_serve_build(seeded, build):
+    build_dir, manifest = build
+    app = seeded(ASSET_BUILD_DIR=build_dir, DEBUG=False)
+    built = manifest["files"]["css/main.css"]
+    html = app.test_client().get("/").get_data(as_text=True)
+    assert "/assets/" + built in html
+
+    client = app.test_client()
+    response = client.get(
+        "/assets/" + built, headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert response.content_encoding == "gzip"
+    assert response.mimetype == "text/css"
+    assert "Accept-Encoding" in response.vary
+    assert response.cache_control.immutable
+    assert response.cache_control.public
+    assert response.cache_control.max_age == app.config["ASSET_MAX_AGE"]
+    plain = client.get("/assets/" + built)
+    assert plain.content_encoding is None
+    assert gzip.decompress(response.data) == plain.data
+
+
+def test_static_fallback(seeded, build):
+    build_dir, manifest = build
+    # in debug mode, or while the build is older than the static files
+    debug = seeded(ASSET_BUILD_DIR=build_dir)
+    os.utime(os.path.join(build_dir, MANIFEST), (0, 0))
+    stale = seeded(ASSET_BUILD_DIR=build_dir, DEBUG=False)
+    for app in (debug, stale):
+        html = app.test_client().get("/").get_data(as_text=True)
+        assert "/static/css/main.css" in html
+        assert "/assets/" not in html
@@ -0,0 +1,53 @@
+import pytest
+
+import dataset
+from conftest import TEST_CONFIG
+from fragments import fragments
+from pages import cache
+
+pytest.importorskip("aiosqlite")
+
+GETS = [
+    "/venues/1",
+    "/venues/7",
+    "/venues/999",
+    "/shows",
+    "/shows?limit=3",
+    "/search?q=a",
+    "/search?q=a&type=venues",
+    "/search?q=zzzz",
+]
+POSTS = [
+    ("/venues/search", {"search_term": "a"}),
+    ("/artists/search", {"search_term": "a"}),
+    ("/artists/search", {}),
+]
+
+
+def responses(app):
+    client = app.test_client()
+    for url in GETS:
+        # neither may serve what the other cached
+        cache.store.clear()
+        fragments.store.clear()
+        yield client.get(url)
+    for url, form in POSTS:
+        yield client.post(url, data=form)
+
+
+def test_async_views_match_the_sync_ones(app):
+    sync = [
+        (response.status_code, response.data) for response in responses(app)
+    ]
+    async_app, _ = dataset.create_bench_app(
+        app.config["SQLALCHEMY_DATABASE_URI"], ASYNC_VIEWS=True, **TEST_CONFIG
+    )
+    assert async_app.view_functions["shows.shows"] is not (
+        app.view_functions["shows.shows"]
+    )
+    served = [
+        (response.status_code, response.data)
+        for response in responses(async_app)
+    ]
+    assert {status for status, _ in sync} == {200, 302, 404}
+    assert served == sync
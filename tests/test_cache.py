@@ -0,0 +1,95 @@
+import pytest
+
+import cache as cache_module
+from cache import Cache, LRUCache, RedisCache
+from models import Venue, db
+
+
+def test_lru_evicts_least_recently_used():
+    store = LRUCache(2, 60)
+    store.set("a", 1)
+    store.set("b", 2)
+    assert store.get("a") == 1
+    store.set("c", 3)
+    assert store.get("b") is None
+    assert (store.get("a"), store.get("c")) == (1, 3)
+    assert store.stats() == {
+        "size": 2,
+        "maxsize": 2,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+    }
+
+
+def test_lru_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    store = LRUCache(16, 60)
+    store.set("page", "html")
+    store.set("short", "html", ttl=5)
+    now[0] += 10
+    assert store.get("short") is None
+    assert store.get("page") == "html"
+    now[0] += 60
+    assert store.get("page") is None
+    assert store.stats()["size"] == 0
+
+
+def test_invalidate_between_get_and_set():
+    cache = Cache(LRUCache(16, 60))
+    key = cache.key("venue:1", "page")
+    assert cache.get(key) is None
+    # a write lands while the miss is reading the database
+    cache.invalidate("venue:1")
+    cache.set(key, "read before the write")
+    assert cache.get(cache.key("venue:1", "page")) is None
+
+    key = cache.key("venue:1", "page")
+    cache.set(key, "fresh")
+    assert cache.get(cache.key("venue:1", "page")) == "fresh"
+    assert cache.get(cache.key("venue:2", "page")) is None
+
+
+def test_redis_clear_keeps_other_keys():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    client.set("session:1", "someone else's")
+    cache = Cache(RedisCache(None, client=client, prefix="fyyur"))
+    for i in range(2500):
+        cache.set(cache.key("venue:{}".format(i), "page"), i)
+    cache.store.clear()
+    assert client.keys() == [b"session:1"]
+    assert cache.get(cache.key("venue:1", "page")) is None
+
+
+def test_detail_page_is_cached(app, count_statements):
+    response, first = count_statements(app, "/artists/1")
+    assert response.status_code == 200
+    response, second = count_statements(app, "/artists/1")
+    assert response.status_code == 200
+    # only the validators of the conditional GET
+    assert second == 1 < first
+
+
+def test_edit_invalidates_pages(app, client):
+    assert b"Renamed Hall" not in client.get("/venues/1").data
+    assert b"Renamed Hall" not in client.get("/venues").data
+    with app.app_context():
+        venue = db.session.get(Venue, 1)
+        form = {
+            "name": "Renamed Hall",
+            "city": venue.city,
+            "state": venue.state,
+            "address": venue.address,
+            "phone": venue.phone,
+            "genres": [genre.name for genre in venue.genres],
+            "image_link": venue.image_link,
+            "facebook_link": venue.facebook_link,
+            "website": venue.website,
+            "seeking_description": venue.seeking_description,
+        }
+    response = client.post("/venues/1/edit", data=form)
+    assert response.status_code == 302
+    assert b"Renamed Hall" in client.get("/venues/1").data
+    assert b"Renamed Hall" in client.get("/venues?limit=200").data
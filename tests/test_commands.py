@@ -0,0 +1,88 @@
+from datetime import datetime
+
+import pages
+from exporter import to_plain
+from models import Artist, Show, Venue, db
+
+
+def test_export_import_round_trip(seeded, tmp_path):
+    source = seeded(shows=100)
+    path = str(tmp_path / "shows.csv")
+    result = source.test_cli_runner().invoke(
+        args=["export", "shows", "--output", path]
+    )
+    assert result.exit_code == 0, result.output
+
+    target = seeded(shows=0)
+    result = target.test_cli_runner().invoke(args=["import", "shows", path])
+    assert result.exit_code == 0, result.output
+    with source.app_context():
+        exported = sorted(
+            (show.venue_id, show.artist_id, show.start_time)
+            for show in Show.query
+        )
+    with target.app_context():
+        imported = sorted(
+            (show.venue_id, show.artist_id, show.start_time)
+            for show in Show.query
+        )
+    assert imported == exported
+
+
+def test_exported_datetimes_drop_microseconds():
+    value = datetime(2026, 5, 1, 20, 30, 15, 123456)
+    assert to_plain(value) == "2026-05-01 20:30:15"
+
+
+def test_delete_venue_and_its_shows(app):
+    with app.app_context():
+        shows = Show.query.filter_by(venue_id=1).count()
+        total = Show.query.count()
+    assert shows
+    result = app.test_cli_runner().invoke(
+        args=["delete", "venue", "1", "--batch-size", "2"]
+    )
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert db.session.get(Venue, 1) is None
+        assert Show.query.count() == total - shows
+    result = app.test_cli_runner().invoke(args=["delete", "venue", "1"])
+    assert result.exit_code != 0
+
+
+def test_delete_artist_page(app, client):
+    assert client.get("/artists/1").status_code == 200
+    response = client.delete("/artists/1")
+    assert response.status_code == 200
+    with app.app_context():
+        assert db.session.get(Artist, 1) is None
+        assert Show.query.filter_by(artist_id=1).count() == 0
+    assert client.get("/artists/1").status_code == 404
+    assert client.delete("/artists/1").status_code == 404
+
+
+def test_import_counts_bad_ids_as_invalid(seeded, tmp_path):
+    app = seeded(shows=0)
+    path = tmp_path / "shows.csv"
+    path.write_text(
+        "venue_id,artist_id,start_time\n"
+        "1,1,2035-01-01 20:00:00\n"
+        "one,1,2035-01-02 20:00:00\n"
+        "2,,2035-01-03 20:00:00\n"
+        "2,2,2035-01-04 20:00:00\n"
+    )
+    result = app.test_cli_runner().invoke(args=["import", "shows", str(path)])
+    assert result.exit_code == 0, result.output
+    assert "2 shows imported, 2 invalid" in result.output
+    with app.app_context():
+        assert Show.query.count() == 2
+
+
+def test_delete_stands_when_invalidation_fails(app, client, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("cache down")
+
+    monkeypatch.setattr(pages.cache, "invalidate", fail)
+    assert client.delete("/venues/2").status_code == 200
+    with app.app_context():
+        assert db.session.get(Venue, 2) is None
@@ -0,0 +1,38 @@
+from pages import cache
+
+
+def test_listing_revalidates_without_queries(app, client, count_statements):
+    response = client.get("/venues")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert "Last-Modified" not in response.headers
+    etag = response.headers["ETag"]
+
+    response, statements = count_statements(
+        app, "/venues", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert statements == 0
+
+    # what a write does, see invalidate_pages
+    with app.app_context():
+        cache.invalidate("listings")
+    response = client.get("/venues", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_detail_page_validators(app, client):
+    response = client.get("/artists/1")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    last_modified = response.headers["Last-Modified"]
+    response = client.get("/artists/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    response = client.get(
+        "/artists/1", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
+    # locale and query string are part of the page
+    response = client.get("/artists/1?x=1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
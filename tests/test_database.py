@@ -0,0 +1,87 @@
+import shutil
+import time
+
+from flask import session
+from sqlalchemy.pool import NullPool
+
+from config import DATABASE_STATEMENT_TIMEOUT
+from database import engine_options, use_replica
+from models import Venue, db
+from pages import invalidate_pages
+
+POSTGRES = {
+    "DATABASE_PGBOUNCER": False,
+    "DATABASE_POOL_SIZE": 5,
+    "DATABASE_MAX_OVERFLOW": 10,
+    "DATABASE_POOL_TIMEOUT": 30,
+    "DATABASE_POOL_RECYCLE": 1800,
+    "DATABASE_POOL_PRE_PING": True,
+    "DATABASE_STATEMENT_TIMEOUT": DATABASE_STATEMENT_TIMEOUT,
+}
+
+
+def test_engine_options():
+    options = engine_options(POSTGRES)
+    assert options["pool_size"] == 5
+    assert options["connect_args"] == {
+        "options": "-c statement_timeout={}".format(
+            DATABASE_STATEMENT_TIMEOUT
+        )
+    }
+    options = engine_options(POSTGRES, asyncpg=True)
+    assert options["connect_args"] == {
+        "server_settings": {
+            "statement_timeout": str(DATABASE_STATEMENT_TIMEOUT)
+        }
+    }
+
+
+def test_pgbouncer_engine_options():
+    config = dict(POSTGRES, DATABASE_PGBOUNCER=True)
+    assert engine_options(config) == {"poolclass": NullPool}
+    options = engine_options(config, asyncpg=True)
+    assert options["poolclass"] is NullPool
+    assert options["connect_args"] == {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+    }
+
+
+def test_replica_routing_is_decided_once_per_request(app):
+    with app.test_request_context("/venues"):
+        assert use_replica()
+        # the client writes in the middle of the request
+        session["db_primary_until"] = time.time() + 60
+        assert use_replica()
+    with app.test_request_context("/venues"):
+        session["db_primary_until"] = time.time() + 60
+        assert not use_replica()
+    with app.test_request_context("/shows/create", method="POST"):
+        assert not use_replica()
+
+
+def test_reads_go_to_the_replica_until_a_write(seeded, tmp_path):
+    replica = tmp_path / "replica.db"
+    app = seeded(DATABASE_REPLICA_URL="sqlite:///{}".format(replica))
+    primary = app.config["SQLALCHEMY_DATABASE_URI"][len("sqlite:///"):]
+    shutil.copy(primary, replica)
+    with app.app_context():
+        db.session.get(Venue, 1).name = "Primary Hall"
+        db.session.commit()
+
+    client = app.test_client()
+    assert b"Primary Hall" not in client.get("/venues/1").data
+    response = client.post(
+        "/shows/create",
+        data={
+            "artist_id": "1",
+            "venue_id": "1",
+            "start_time": "2035-01-01 20:00:00",
+        },
+    )
+    assert response.status_code == 200
+    assert b"Primary Hall" in client.get("/venues/1").data
+    # another client still reads the replica
+    with app.app_context():
+        invalidate_pages(venue_ids=[1])
+    assert b"Primary Hall" not in app.test_client().get("/venues/1").data
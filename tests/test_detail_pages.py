@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.mark.parametrize("url", ["/venues/1", "/artists/1", "/venues/7"])
+def test_statements_do_not_grow_with_shows(seeded, count_statements, url):
+    counts = []
+    for shows in (40, 400):
+        response, count = count_statements(seeded(shows=shows), url)
+        assert response.status_code == 200
+        counts.append(count)
+    assert counts[0] == counts[1]
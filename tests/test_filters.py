@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import babel.dates
+
+from filters import DATETIME_FORMATS, datetime_pattern, format_datetime
+
+VALUE = datetime(2035, 1, 6, 20, 30)
+
+
+def test_format_datetime_matches_babel(app):
+    with app.test_request_context():
+        app.preprocess_request()
+        for format in ("full", "medium"):
+            assert format_datetime(VALUE, format) == (
+                babel.dates.format_datetime(
+                    VALUE, DATETIME_FORMATS[format], locale="en_US"
+                )
+            )
+        assert format_datetime("2035-01-06 20:30:00") == format_datetime(
+            VALUE
+        )
+        assert format_datetime(VALUE, "short") == (
+            babel.dates.format_datetime(VALUE, "short", locale="en_US")
+        )
+
+
+def test_patterns_are_parsed_once(app):
+    with app.test_request_context():
+        app.preprocess_request()
+        format_datetime(VALUE, "full")
+        hits = datetime_pattern.cache_info().hits
+        format_datetime(VALUE, "full")
+        format_datetime(VALUE, "full")
+    assert datetime_pattern.cache_info().hits == hits + 2
+
+
+def test_format_datetime_in_the_visitor_time_zone(app):
+    with app.test_request_context(
+        headers={"Cookie": "timezone=America/New_York"}
+    ):
+        app.preprocess_request()
+        # stored in UTC
+        assert format_datetime(VALUE, "h:mma") == "3:30PM"
+    with app.test_request_context(headers={"Cookie": "timezone=Nowhere"}):
+        app.preprocess_request()
+        assert format_datetime(VALUE, "h:mma") == "8:30PM"
@@ -0,0 +1,79 @@
+import re
+from datetime import datetime, timedelta
+
+from fragments import fragments
+from models import Show, db, refresh_show_counts
+from pages import cache
+
+VENUES = "/venues?limit=200"
+
+
+def served(template):
+    results = dict(fragments.results())
+    return results.get((template, True), 0), results.get((template, False), 0)
+
+
+def upcoming(html, venue_id):
+    match = re.search(
+        r'href="/venues/{}">.*?<p>(\d+) upcoming'.format(venue_id),
+        html,
+        re.S,
+    )
+    return int(match.group(1))
+
+
+def test_venue_areas_are_cached(client):
+    hits, misses = served("pages/venues.html")
+    first = client.get(VENUES).data
+    areas = first.count(b"<h3>")
+    assert areas
+    assert served("pages/venues.html") == (hits, misses + areas)
+    assert client.get(VENUES).data == first
+    assert served("pages/venues.html") == (hits + areas, misses + areas)
+
+
+def test_venue_area_follows_show_counts(app, client):
+    before = upcoming(client.get(VENUES).get_data(as_text=True), 1)
+    with app.app_context():
+        db.session.add(
+            Show(
+                venue_id=1,
+                artist_id=1,
+                start_time=datetime.today() + timedelta(days=1000),
+            )
+        )
+        db.session.commit()
+        refresh_show_counts()
+    cache.invalidate("listings")
+    after = upcoming(client.get(VENUES).get_data(as_text=True), 1)
+    assert after == before + 1
+
+
+def test_show_cards_are_cached(client):
+    hits, misses = served("pages/shows.html")
+    first = client.get("/shows?limit=10").data
+    assert served("pages/shows.html") == (hits, misses + 10)
+    assert client.get("/shows?limit=10").data == first
+    assert served("pages/shows.html") == (hits + 10, misses + 10)
+
+    # the visitor's time zone is part of the key
+    client.set_cookie("localhost", "timezone", "America/New_York")
+    assert client.get("/shows?limit=10").data != first
+    assert served("pages/shows.html") == (hits + 10, misses + 20)
+
+    stats = client.get("/cache/stats").get_json()["fragments"]
+    assert stats["templates"]["pages/shows.html"] == {
+        "hits": served("pages/shows.html")[0],
+        "misses": served("pages/shows.html")[1],
+    }
+
+
+def test_fragments_with_undefined_keys_are_not_cached(app):
+    template = app.jinja_env.from_string(
+        "{% cache ['card', card.missing] %}{{ card.name }}{% endcache %}"
+    )
+    before = fragments.results()
+    with app.app_context():
+        assert template.render(card={"name": "a"}) == "a"
+        assert template.render(card={"name": "b"}) == "b"
+    assert fragments.results() == before
@@ -0,0 +1,51 @@
+import logging
+import re
+
+import pytest
+
+
+def queries(app, endpoint):
+    text = app.test_client().get("/metrics").get_data(as_text=True)
+    match = re.search(
+        r'^fyyur_sql_queries_total\{{endpoint="{}"\}} (\d+)$'.format(
+            re.escape(endpoint)
+        ),
+        text,
+        re.M,
+    )
+    return int(match.group(1)) if match else 0
+
+
+def test_metrics_count_queries(app, count_statements):
+    before = queries(app, "venues.show_venue")
+    response, statements = count_statements(app, "/venues/1")
+    assert response.status_code == 200
+    assert statements
+    assert queries(app, "venues.show_venue") == before + statements
+
+    response = app.test_client().get("/metrics")
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    text = response.get_data(as_text=True)
+    assert "# TYPE fyyur_request_duration_seconds histogram" in text
+    assert 'fyyur_request_duration_seconds_count{endpoint="metrics"}' in text
+
+
+def test_query_budget(seeded, caplog):
+    app = seeded(METRICS_QUERY_BUDGET=0)
+    with caplog.at_level(logging.WARNING):
+        app.test_client().get("/venues/1")
+    assert any(
+        "over the budget of 0" in record.getMessage()
+        for record in caplog.records
+    )
+
+
+def test_async_views_count_queries(seeded, count_statements):
+    pytest.importorskip("aiosqlite")
+    app = seeded(ASYNC_VIEWS=True)
+    before = queries(app, "shows.shows")
+    response, statements = count_statements(app, "/shows")
+    assert response.status_code == 200
+    # none of them ran on the sync engine
+    assert statements == 0
+    assert queries(app, "shows.shows") > before
@@ -0,0 +1,114 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect
+
+from models import (
+    ArtistShowCount,
+    Genre,
+    Show,
+    Venue,
+    VenueShowCount,
+    db,
+)
+
+
+def query_plan(query):
+    statement = query.statement.compile(
+        db.engine, compile_kwargs={"literal_binds": True}
+    )
+    rows = db.session.execute(
+        db.text("EXPLAIN QUERY PLAN {}".format(statement))
+    )
+    return " ".join(row[-1] for row in rows)
+
+
+def test_hot_path_indexes(app):
+    with app.app_context():
+        inspector = inspect(db.engine)
+        indexes = {
+            table: {index["name"] for index in inspector.get_indexes(table)}
+            for table in ("show", "venue", "artist")
+        }
+        assert {
+            "ix_show_start_time",
+            "ix_show_venue_id_start_time",
+            "ix_show_artist_id_start_time",
+        } <= indexes["show"]
+        assert "ix_venue_state_city" in indexes["venue"]
+        assert {"ix_artist_name", "ix_artist_state_city"} <= indexes["artist"]
+
+        now = datetime.today()
+        plan = query_plan(
+            Show.query.filter(Show.venue_id == 1, Show.start_time > now)
+        )
+        assert "ix_show_venue_id_start_time" in plan
+        plan = query_plan(
+            Show.query.filter(Show.artist_id == 1, Show.start_time > now)
+        )
+        assert "ix_show_artist_id_start_time" in plan
+
+
+def test_genres_from_names(app):
+    with app.app_context():
+        jazz = Genre.query.filter_by(name="Jazz").one()
+        genres = Genre.from_names(["Zydeco", "Jazz", "Zydeco", "Jazz"])
+        assert [genre.name for genre in genres] == ["Zydeco", "Jazz"]
+        assert genres[1] is jazz
+        assert genres[0].id is None
+
+        venue = db.session.get(Venue, 1)
+        venue.genres = genres
+        db.session.commit()
+        assert Genre.query.filter_by(name="Zydeco").count() == 1
+        assert Genre.from_names(["Zydeco"])[0].id == genres[0].id
+
+
+def test_venues_by_genre(app, client):
+    with app.app_context():
+        venue = db.session.get(Venue, 1)
+        venue.genres = Genre.from_names(["Zydeco"])
+        db.session.commit()
+        name = venue.name
+    response = client.get("/venues/genres/Zydeco")
+    assert response.status_code == 200
+    assert name.encode() in response.data
+    html = client.get("/venues/1").get_data(as_text=True)
+    assert "Zydeco" in html
+    assert "{" not in html.split('<div class="genres">')[1].split("</div>")[0]
+
+
+def show_counts(key, now):
+    upcoming, past = Counter(), Counter()
+    for show in Show.query:
+        counts = upcoming if show.start_time > now else past
+        counts[getattr(show, key)] += 1
+    return upcoming, past
+
+
+def test_refresh_show_counts(app):
+    with app.app_context():
+        db.session.add(
+            Show(
+                venue_id=2,
+                artist_id=3,
+                start_time=datetime.today() + timedelta(days=1000),
+            )
+        )
+        db.session.commit()
+    result = app.test_cli_runner().invoke(args=["refresh-show-counts"])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        now = datetime.today()
+        for model, key in (
+            (VenueShowCount, "venue_id"),
+            (ArtistShowCount, "artist_id"),
+        ):
+            upcoming, past = show_counts(key, now)
+            rows = model.query.all()
+            ids = {getattr(row, key) for row in rows}
+            assert ids == set(upcoming) | set(past)
+            for row in rows:
+                id = getattr(row, key)
+                assert row.upcoming_shows == upcoming[id]
+                assert row.past_shows == past[id]
@@ -0,0 +1,88 @@
+import re
+from html import unescape
+
+from models import Artist, Venue, db
+from pages import parse_cursor
+
+
+def walk(client, url):
+    # the ids linked from every page of a listing, following "Next"
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        html = response.get_data(as_text=True)
+        ids.extend(int(id) for id in re.findall(r'href="/\w+/(\d+)"', html))
+        next = re.search(r'<li class="next"><a href="([^"]+)"', html)
+        url = next and unescape(next.group(1))
+    return ids
+
+
+def test_parse_cursor_commas():
+    assert parse_cursor("Band, The,3", (str, int)) == ["Band, The", 3]
+    assert parse_cursor("ME,Portland, Maine,7", (str, str, int)) == [
+        "ME",
+        "Portland, Maine",
+        7,
+    ]
+    assert parse_cursor("12", (int,)) == [12]
+    assert parse_cursor(None, (int,)) is None
+
+
+def test_listings_page_through_commas(app):
+    with app.app_context():
+        for venue in Venue.query.filter(Venue.id % 3 == 0):
+            venue.city = "Portland, Maine"
+        for artist in Artist.query.filter(Artist.id % 3 == 0):
+            artist.name = "Band, The {}".format(artist.id)
+        db.session.commit()
+    client = app.test_client()
+    venue_ids = walk(client, "/venues?limit=3")
+    assert sorted(venue_ids) == list(range(1, 21))
+    artist_ids = walk(client, "/artists?limit=3")
+    assert sorted(artist_ids) == list(range(1, 21))
+
+
+def test_venue_areas_take_one_query(seeded, count_statements):
+    counts = []
+    for venues in (20, 200):
+        app = seeded(venues=venues)
+        response, count = count_statements(app, "/venues?limit=200")
+        assert response.status_code == 200
+        counts.append(count)
+    assert counts[0] == counts[1]
+
+
+def test_venue_areas_group_their_venues(app, client):
+    html = client.get("/venues?limit=200").get_data(as_text=True)
+    areas = re.findall(r"<h3>(.*?)</h3>(.*?)</ul>", html, re.S)
+    headings = [unescape(heading) for heading, _ in areas]
+    assert len(areas) > 1
+    assert sum(venues.count("href=") for _, venues in areas) == 20
+    assert len(headings) == len(set(headings))
+    with app.app_context():
+        for heading, venues in areas:
+            for id in re.findall(r'href="/venues/(\d+)"', venues):
+                venue = db.session.get(Venue, int(id))
+                assert heading == "{}, {}".format(venue.city, venue.state)
+
+
+def test_listings_stream(seeded, count_statements):
+    app = seeded(shows=400)
+    for url in ("/shows?limit=100", "/artists?limit=10"):
+        response = app.test_client().get(url, buffered=False)
+        assert response.is_streamed
+        chunks = list(response.response)
+        response.close()
+        assert len(chunks) > 1
+        # the pager comes after the rows, once their cursors are known
+        assert b'<li class="next">' in b"".join(chunks)
+
+    # a page left unfinished isn't cached
+    response = app.test_client().get("/shows?limit=99", buffered=False)
+    next(iter(response.response))
+    response.close()
+    response, statements = count_statements(app, "/shows?limit=99")
+    assert statements
+    response, statements = count_statements(app, "/shows?limit=99")
+    assert statements == 0
@@ -0,0 +1,52 @@
+from sqlalchemy.dialects import postgresql
+
+from models import Genre, Venue, db
+from search import full_text_search, prefix_tsquery, search_queries
+
+
+def test_prefix_tsquery():
+    assert prefix_tsquery("musical ho") == "musical:* & ho:*"
+    assert prefix_tsquery("Live Music & Coffee") == (
+        "Live:* & Music:* & Coffee:*"
+    )
+    assert prefix_tsquery(" & ") == ""
+
+
+def test_search_ranks_name_matches_first(app):
+    with app.app_context():
+        db.session.get(Venue, 7).name = "The Musical Hop"
+        db.session.get(Venue, 3).seeking_description = "musical acts"
+        db.session.commit()
+        results = full_text_search(Venue, "MUSICAL", 50)
+        assert [venue.id for venue in results[:2]] == [7, 3]
+        assert len(full_text_search(Venue, "musical", 1)) == 1
+
+
+def test_search_matches_genres(app):
+    with app.app_context():
+        jazz = Venue.query.join(Venue.genres).filter(Genre.name == "Jazz")
+        expected = {venue.id for venue in jazz}
+        assert expected
+        results = full_text_search(Venue, "jazz", 50)
+        assert expected <= {venue.id for venue in results}
+
+
+def test_search_view(app, client):
+    with app.app_context():
+        db.session.get(Venue, 7).name = "The Musical Hop"
+        db.session.commit()
+    response = client.post("/venues/search", data={"search_term": "hop"})
+    assert response.status_code == 200
+    assert b"The Musical Hop" in response.data
+
+
+def test_postgresql_queries(app):
+    with app.app_context():
+        matches, fallback = search_queries(
+            Venue.query, Venue, "musical ho", 10, "postgresql"
+        )
+    dialect = postgresql.dialect()
+    sql = str(matches.statement.compile(dialect=dialect))
+    assert "to_tsquery" in sql and "@@" in sql and "ts_rank" in sql
+    sql = str(fallback.statement.compile(dialect=dialect))
+    assert "similarity" in sql and "%" in sql
@@ -0,0 +1,63 @@
+from flask import get_flashed_messages
+
+from models import SHOW_SLOT_HOURS, Show
+
+
+def post_show(client, **form):
+    data = dict(
+        {
+            "artist_id": "1",
+            "venue_id": "1",
+            "start_time": "2035-01-01 20:00:00",
+        },
+        **form
+    )
+    with client:
+        response = client.post("/shows/create", data=data)
+        return response, get_flashed_messages()
+
+
+def test_create_show(app, client):
+    with app.app_context():
+        count = Show.query.count()
+    response, messages = post_show(client)
+    assert response.status_code == 200
+    assert messages == ["Show was successfully listed!"]
+    with app.app_context():
+        assert Show.query.count() == count + 1
+
+    response, messages = post_show(client, start_time="2035-01-01 21:00:00")
+    assert response.status_code == 302
+    assert messages == ["This time was booked. Please reselect."]
+
+
+def test_create_show_after_the_slot(app):
+    response, messages = post_show(app.test_client())
+    assert messages == ["Show was successfully listed!"]
+    later = "2035-01-01 {}:00:00".format(20 + SHOW_SLOT_HOURS)
+    response, messages = post_show(app.test_client(), start_time=later)
+    assert messages == ["Show was successfully listed!"]
+
+
+def test_create_show_rejects_bad_input(app):
+    with app.app_context():
+        count = Show.query.count()
+    for form in (
+        {"start_time": "not a time"},
+        {"start_time": "2035-02-30 20:00:00"},
+        {"artist_id": "one"},
+        {"venue_id": ""},
+        {"artist_id": "999"},
+    ):
+        response, messages = post_show(app.test_client(), **form)
+        assert response.status_code == 302, form
+        assert response.location.endswith("/shows/create")
+        assert len(messages) == 1
+    with app.app_context():
+        assert Show.query.count() == count
+
+
+def test_create_show_form(client):
+    response = client.get("/shows/create")
+    assert response.status_code == 200
+    assert b'name="artist_id"' in response.data
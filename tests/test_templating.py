@@ -0,0 +1,43 @@
+import os
+
+from jinja2 import ChoiceLoader
+
+from templating import template_names, warm_up
+
+
+def test_compiled_bundle(seeded, tmp_path, monkeypatch):
+    # outside debug mode the app logs to error.log in the working directory
+    monkeypatch.chdir(tmp_path)
+    bundle = str(tmp_path / "bundle")
+    app = seeded()
+    result = app.test_cli_runner().invoke(
+        args=["compile-templates", "--output", bundle]
+    )
+    assert result.exit_code == 0, result.output
+    modules = [name for name in os.listdir(bundle) if name.endswith(".py")]
+    assert len(modules) == len(template_names(app))
+
+    bundled = seeded(TEMPLATE_BUNDLE=bundle, DEBUG=False)
+    assert isinstance(bundled.jinja_env.loader, ChoiceLoader)
+    for url in ("/", "/venues/1", "/shows"):
+        assert bundled.test_client().get(url).data == (
+            app.test_client().get(url).data
+        )
+
+    # older than the templates: ignored
+    os.utime(bundle, (0, 0))
+    stale = seeded(TEMPLATE_BUNDLE=bundle, DEBUG=False)
+    assert not isinstance(stale.jinja_env.loader, ChoiceLoader)
+
+
+def test_bytecode_cache(seeded, tmp_path):
+    cache_dir = tmp_path / "bytecode"
+    app = seeded(TEMPLATE_CACHE_DIR=str(cache_dir))
+    assert app.test_client().get("/").status_code == 200
+    assert any(name.endswith(".cache") for name in os.listdir(cache_dir))
+
+
+def test_warm_up(app):
+    warm_up(app)
+    loaded = {name for _, name in app.jinja_env.cache.keys()}
+    assert set(template_names(app)) <= loaded
@@ -0,0 +1,368 @@
+import sys
+from datetime import datetime
+from itertools import groupby
+
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from models import (
+    Artist,
+    Genre,
+    Show,
+    Venue,
+    VenueShowCount,
+    db,
+    delete_with_shows,
+    entity_deleted,
+)
+from pages import (
+    VENUE_FIELDS,
+    abort_if_not_modified,
+    bucket_start,
+    cache,
+    entity_dict,
+    invalidate_pages,
+    listing_cache_key,
+    listing_validators,
+    now_bucket,
+    paginate,
+    venue_artist_ids,
+    venue_show_dict,
+)
+from search import full_text_search
+
+bp = Blueprint("venues", __name__)
+
+
+@bp.route("/venues")
+def venues():
+    from forms import SearchForm
+
+    # TODO: replace with real venues data. [done]
+    # [done] num_shows should be aggregated based on number of upcoming shows per venue.
+    now = datetime.today()
+    abort_if_not_modified(*listing_validators(now))
+    form = SearchForm()
+    cache_key = listing_cache_key(now)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        data, page = cached
+        return render_template(
+            "pages/venues.html", areas=data, form=form, page=page
+        )
+    # upcoming counts are as of the last refresh_show_counts
+    venues, page = paginate(
+        Venue.query.outerjoin(
+            VenueShowCount, VenueShowCount.venue_id == Venue.id
+        ).with_entities(
+            Venue.id,
+            Venue.name,
+            Venue.city,
+            Venue.state,
+            Venue.updated_at,
+            func.coalesce(VenueShowCount.upcoming_shows, 0).label(
+                "num_upcoming_shows"
+            ),
+            VenueShowCount.refreshed_at,
+        ),
+        (Venue.state, Venue.city, Venue.id),
+        (str, str, int),
+    )
+    data = []
+    for (city, state), area_venues in groupby(
+        venues, key=lambda venue: (venue.city, venue.state)
+    ):
+        city_data = {"city": city, "state": state, "venues": []}
+        updated = []
+        refreshed = []
+        for venue in area_venues:
+            venue_data = {
+                "id": venue.id,
+                "name": venue.name,
+                "num_upcoming_shows": venue.num_upcoming_shows,
+            }
+            city_data["venues"].append(venue_data)
+            updated.append(venue.updated_at)
+            refreshed.append(venue.refreshed_at)
+        # key of the area's fragment: which venues, and when they or their
+        # counts last changed
+        city_data["cache_key"] = [
+            [venue["id"] for venue in city_data["venues"]],
+            max(filter(None, updated), default=None),
+            max(filter(None, refreshed), default=None),
+        ]
+        data.append(city_data)
+    cache.set(cache_key, (data, page))
+    return render_template(
+        "pages/venues.html", areas=data, form=form, page=page
+    )
+
+
+@bp.route("/venues/search", methods=["POST"])
+def search_venues():
+    # [done] TODO: implement search on artists with partial string search. Ensure it is case-insensitive.
+    # seach for Hop should return "The Musical Hop".
+    # search for "Music" should return "The Musical Hop" and "Park Square Live Music & Coffee"
+    search_form = request.form
+    if "search_term" in search_form:
+        search_term = search_form.get("search_term", "")
+        if search_term:
+            res = full_text_search(
+                Venue, search_term, current_app.config["SEARCH_RESULT_LIMIT"]
+            )
+            response = {}
+            response["count"] = len(res)
+            response["data"] = []
+            for r in res:
+                r_data = {
+                    "id": r.id,
+                    "name": r.name,
+                }
+                response["data"].append(r_data)
+
+            return render_template(
+                "pages/search_venues.html",
+                results=response,
+                search_term=search_form["search_term"],
+            )
+    if "city" in search_form:
+        city = search_form["city"]
+        state = search_form["state"]
+        res = (
+            Venue.query.filter(and_(Venue.city == city, Venue.state == state))
+            .order_by(Venue.id)
+            .all()
+        )
+        response = {}
+        response["count"] = len(res)
+        response["data"] = []
+        for r in res:
+            r_data = {
+                "id": r.id,
+                "name": r.name,
+            }
+            response["data"].append(r_data)
+
+        return render_template(
+            "pages/search_venues.html",
+            results=response,
+            search_term="{} {}".format(city, state),
+        )
+
+    return redirect(url_for(".venues"))
+
+
+@bp.route("/venues/genres/<genre>")
+def venues_by_genre(genre):
+    # served by the genre name and venue_genre.genre_id indexes
+    res = (
+        Venue.query.join(Venue.genres)
+        .filter(Genre.name == genre)
+        .order_by(Venue.id)
+        .limit(current_app.config["SEARCH_RESULT_LIMIT"])
+        .all()
+    )
+    response = {
+        "count": len(res),
+        "data": [{"id": r.id, "name": r.name} for r in res],
+    }
+    return render_template(
+        "pages/search_venues.html", results=response, search_term=genre
+    )
+
+
+def venue_validators(venue_id):
+    # what the venue page depends on: the venue, its shows and their artists
+    return (
+        select(
+            Venue.updated_at,
+            func.max(Show.updated_at),
+            func.max(Artist.updated_at),
+            func.count(Show.id),
+        )
+        .select_from(Venue)
+        .outerjoin(Venue.children)
+        .outerjoin(Show.artist)
+        .filter(Venue.id == venue_id)
+        .group_by(Venue.id)
+    )
+
+
+@bp.route("/venues/<int:venue_id>")
+def show_venue(venue_id):
+    # shows the venue page with the given venue_id
+    # [done] TODO: replace with real venue data from the venues table, using venue_id
+    now = datetime.today()
+    validators = db.session.execute(venue_validators(venue_id)).first()
+    if validators is None:
+        abort(404)
+    abort_if_not_modified(bucket_start(now), *validators)
+    cache_key = cache.key("venue:{}".format(venue_id), now_bucket(now))
+    venue_data = cache.get(cache_key)
+    if venue_data is not None:
+        return render_template("pages/show_venue.html", venue=venue_data)
+    venue = Venue.query.options(
+        joinedload(Venue.children).joinedload(Show.artist),
+        selectinload(Venue.genres),
+    ).get(venue_id)
+    if venue is None:
+        abort(404)
+    venue_data = entity_dict(venue, VENUE_FIELDS)
+    # shows and their artists come back with the venue in one joined query,
+    # so past/upcoming are split here instead of with two more queries
+    past_shows = []
+    upcoming_shows = []
+    for data in sorted(venue.children, key=lambda show: show.start_time):
+        show = venue_show_dict(data)
+        # the key of its card's {% cache %} fragment
+        show["id"] = data.id
+        show["updated_at"] = max(data.updated_at, data.artist.updated_at)
+        if data.start_time <= now:
+            past_shows.append(show)
+        else:
+            upcoming_shows.append(show)
+    venue_data["past_shows"] = past_shows
+    venue_data["past_shows_count"] = len(past_shows)
+    venue_data["upcoming_shows"] = upcoming_shows
+    venue_data["upcoming_shows_count"] = len(upcoming_shows)
+    cache.set(cache_key, venue_data)
+    return render_template("pages/show_venue.html", venue=venue_data)
+
+
+#  Create Venue
+#  ----------------------------------------------------------------
+
+
+@bp.route("/venues/create", methods=["GET"])
+def create_venue_form():
+    from forms import VenueForm
+
+    form = VenueForm()
+    return render_template("forms/new_venue.html", form=form)
+
+
+@bp.route("/venues/create", methods=["POST"])
+def create_venue_submission():
+    # [done] TODO: insert form data as a new Venue record in the db, instead
+    # [done] TODO: modify data to be the data object returned from db insertion
+    venue_info = request.form
+    venue_info = venue_info.to_dict(flat=False)
+    try:
+        venue = Venue(
+            name=venue_info["name"][0],
+            image_link=venue_info["image_link"][0],
+            city=venue_info["city"][0],
+            state=venue_info["state"][0],
+            address=venue_info["address"][0],
+            phone=venue_info["phone"][0],
+            genres=Genre.from_names(venue_info["genres"]),
+            website=venue_info["website"][0],
+            facebook_link=venue_info["facebook_link"][0],
+            seeking_talent=True if "seeking_talent" in venue_info else False,
+            seeking_description=venue_info["seeking_description"][0],
+        )
+        db.session.add(venue)
+        db.session.commit()
+        cache.invalidate("listings")
+        # on successful db insert, flash success
+        flash("Venue " + venue_info["name"][0] + " was successfully listed!")
+    except:
+        db.session.rollback()
+        print(sys.exc_info())
+        flash(
+            "An error occurred. Venue "
+            + venue_info["name"][0]
+            + " could not be listed."
+        )
+    finally:
+        db.session.close()
+
+    # [done] TODO: on unsuccessful db insert, flash an error instead.
+    # e.g., flash('An error occurred. Venue ' + data.name + ' could not be listed.')
+    # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+    return render_template("pages/home.html")
+
+
+@bp.route("/venues/<int:venue_id>", methods=["DELETE"])
+def delete_venue(venue_id):
+    # TODO: Complete this endpoint for taking a venue_id, and using
+    # SQLAlchemy ORM to delete a record. Handle cases where the session commit could fail.
+    error = False
+    try:
+        deleted = delete_with_shows(
+            Venue, venue_id, current_app.config["DELETE_BATCH_SIZE"]
+        )
+    except:
+        error = True
+        db.session.rollback()
+        print(sys.exc_info())
+    finally:
+        db.session.close()
+    if error:
+        abort(500)
+    elif deleted is None:
+        abort(404)
+    name, ids = deleted
+    try:
+        # its pages are invalidated by pages.invalidate_deleted
+        entity_deleted.send(Venue, **ids)
+    except Exception:
+        # the delete is committed all the same; stale pages age out
+        current_app.logger.exception("invalidating %s failed", name)
+    flash(name + " is deleted successfully.")
+    return jsonify({"success": True})
+    # BONUS CHALLENGE: Implement a button to delete a Venue on a Venue Page, have it so that
+    # clicking that button delete it from the db then redirect the user to the homepage
+
+
+#  Update Venue
+#  ----------------------------------------------------------------
+
+
+@bp.route("/venues/<int:venue_id>/edit", methods=["GET"])
+def edit_venue(venue_id):
+    from forms import VenueForm
+
+    form = VenueForm()
+    venue = Venue.query.get(venue_id)
+    venue_data = entity_dict(venue, VENUE_FIELDS)
+    form = VenueForm(data=venue_data)
+
+    # [done] TODO: populate form with values from venue with ID <venue_id>
+    return render_template("forms/edit_venue.html", form=form, venue=venue)
+
+
+@bp.route("/venues/<int:venue_id>/edit", methods=["POST"])
+def edit_venue_submission(venue_id):
+    # [done] TODO: take values from the form submitted, and update existing
+    # venue record with ID <venue_id> using the new attributes
+    venue = Venue.query.get(venue_id)
+    venue_info = request.form
+    venue_info = venue_info.to_dict(flat=False)
+    venue.name = venue_info["name"][0]
+    venue.image_link = venue_info["image_link"][0]
+    venue.city = venue_info["city"][0]
+    venue.state = venue_info["state"][0]
+    venue.address = venue_info["address"][0]
+    venue.website = venue_info["website"][0]
+    venue.phone = venue_info["phone"][0]
+    venue.genres = Genre.from_names(venue_info["genres"])
+    venue.facebook_link = venue_info["facebook_link"][0]
+    venue.seeking_talent = True if "seeking_talent" in venue_info else False
+    venue.seeking_description = venue_info["seeking_description"][0]
+    db.session.commit()
+    invalidate_pages(
+        venue_ids=[venue_id], artist_ids=venue_artist_ids(venue_id)
+    )
+    return redirect(url_for(".show_venue", venue_id=venue_id))